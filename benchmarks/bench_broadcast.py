@@ -0,0 +1,29 @@
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_telegram import FakeTelegram
+from broadcast import broadcast
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Broadcast throughput against a local fake Telegram API")
+    parser.add_argument("--subscribers", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake API call")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.01, help="share of sends answered with 429")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with FakeTelegram(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio) as fake:
+        send_url = f"{fake.api_base}/botTEST/sendMessage"
+        chat_ids = [str(100000 + i) for i in range(args.subscribers)]
+        report = broadcast(send_url, chat_ids, "📢 benchmark notice", workers=args.workers)
+
+    print(f"📊 Fake API: {len(fake.sent)} delivered, {fake.rate_limited} answered with 429")
+    assert report["sent"] + report["failed"] == args.subscribers
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, ROOT)
+
+import db
+import broadcast
+import test_code
+from notice_store import NoticeStore
+from pipeline import NoticePipeline
+from subscribers import SubscriberStore
+from fake_telegram import FakeTelegram
+from bench_scrape import serve_fixtures
+
+# handle_telegram_updates reads one getUpdates page per run
+START_UPDATES = 100
+
+
+# Set by --tracemalloc: per-stage Python allocation peak instead of process peak RSS
+TRACE_ALLOCATIONS = False
+
+
+def measure(label, func, items, results):
+    """Run func() and record wall time, throughput and peak memory"""
+    if TRACE_ALLOCATIONS:
+        tracemalloc.start()
+    started = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - started
+    if TRACE_ALLOCATIONS:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        # ru_maxrss is in KiB on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    results.append({
+        "stage": label,
+        "items": items,
+        "seconds": elapsed,
+        "per_sec": items / elapsed if elapsed > 0 else float("inf"),
+        "peak_mb": peak / 1024 / 1024
+    })
+    return value
+
+
+def run_scenario(fake, fixture_url, subscribers, archived):
+    """One isolated run of the real pipeline stages in a scratch directory"""
+    results = []
+    workdir = tempfile.mkdtemp(prefix="nu-bench-")
+    os.chdir(workdir)
+    db.DB_FILE = os.path.join(workdir, "nu_bot.db")
+    fake.updates.clear()
+    fake.sent.clear()
+
+    # Seed the archive and the subscribers that do not come through /start
+    store = NoticeStore()
+    store.add_many(
+        {"title": f"Archived notice {i}", "url": f"https://www.nu.ac.bd/uploads/notices/archived_{i}.pdf", "date": "January 1, 2024"}
+        for i in range(archived)
+    )
+    via_start = min(subscribers, START_UPDATES)
+    registry = SubscriberStore()
+    for i in range(via_start, subscribers):
+        registry.upsert(str(500000 + i), f"User {i}")
+    registry.flush()
+    for i in range(via_start):
+        fake.add_message(500000 + i, "/start", f"User {i}")
+
+    measure("handle_telegram_updates", test_code.handle_telegram_updates, via_start, results)
+
+    test_code.BASE_URL = fixture_url
+    notices = measure("scrape_nu_notices", test_code.scrape_nu_notices, test_code.MAX_NOTICES, results)
+
+    def pipeline():
+        today = datetime.now().strftime("%Y-%m-%d")
+        return NoticePipeline(today, test_code.queue_notification, test_code.deliver_pending_notifications).run(notices)
+    measure("pipeline (dedup + store)", pipeline, len(notices), results)
+
+    message = "📅 Benchmark\n\n🔔 New Notices Found\n\n" + "\n".join(n["title"] for n in notices[:5])
+    measure("send_telegram_notification", lambda: test_code.send_telegram_notification(message), subscribers, results)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark with a fake Telegram API and recorded NU pages")
+    parser.add_argument("--subscribers", default="10,1000,50000")
+    parser.add_argument("--archive", default="20,10000")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fake API call")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="share of sendMessage calls answered with 429")
+    parser.add_argument("--real-rate", action="store_true", help="keep Telegram's 30 msg/s limit (slow for large runs)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="report per-stage Python allocation peaks (much slower) instead of process peak RSS")
+    args = parser.parse_args()
+
+    global TRACE_ALLOCATIONS
+    TRACE_ALLOCATIONS = args.tracemalloc
+
+    if not args.real_rate:
+        # Measure the engine itself rather than Telegram's published limit
+        broadcast.global_bucket = broadcast.TokenBucket(1_000_000)
+        broadcast.chat_limiter = broadcast.PerChatLimiter(0)
+
+    server, base = serve_fixtures()
+    rows = []
+    with FakeTelegram(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio, retry_after=0) as fake:
+        test_code.TELEGRAM_BOT_TOKEN = "BENCH"
+        test_code.TELEGRAM_API_BASE = fake.api_base
+        for subscribers in (int(x) for x in args.subscribers.split(",")):
+            for archived in (int(x) for x in args.archive.split(",")):
+                print(f"\n=== {subscribers} subscribers / {archived} archived notices ===")
+                for result in run_scenario(fake, base + "nu_home.html", subscribers, archived):
+                    rows.append((subscribers, archived, result))
+    server.shutdown()
+
+    print(f"\n{'subs':>6} {'archive':>8}  {'stage':<28} {'items':>7} {'seconds':>9} {'items/s':>10} {'peak MB':>8}")
+    print(f"(peak MB = {'per-stage traced Python allocations' if args.tracemalloc else 'process peak RSS so far'})")
+    for subscribers, archived, r in rows:
+        print(f"{subscribers:>6} {archived:>8}  {r['stage']:<28} {r['items']:>7} {r['seconds']:>9.3f} "
+              f"{r['per_sec']:>10.1f} {r['peak_mb']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
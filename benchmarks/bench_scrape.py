@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, ROOT)
+
+import test_code
+from notice_parser import parse_notice_rows
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_fixtures():
+    handler = functools.partial(QuietHandler, directory=FIXTURES)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def timed(label, func, runs):
+    durations = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - started)
+    best = min(durations) * 1000
+    mean = sum(durations) / len(durations) * 1000
+    print(f"{label:<28} runs={runs:<4} best={best:9.2f} ms  mean={mean:9.2f} ms  rows={len(result or [])}")
+    return mean
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the HTTP and Playwright scraping paths on saved HTML")
+    parser.add_argument("--fixture", default="nu_home.html")
+    parser.add_argument("--http-runs", type=int, default=50)
+    parser.add_argument("--browser-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, args.fixture), encoding="utf-8") as f:
+        html = f.read()
+
+    server, base = serve_fixtures()
+    test_code.BASE_URL = base + args.fixture
+    try:
+        timed("parse only (html.parser)", lambda: parse_notice_rows(html, base), args.http_runs)
+        http_mean = timed("HTTP fast path", lambda: test_code.fetch_notices_http(conditional=False), args.http_runs)
+        try:
+            import playwright  # noqa: F401
+        except ImportError:
+            print("Playwright not installed - skipping the browser path")
+            return
+        browser_mean = timed("Playwright browser path", test_code.scrape_nu_notices_browser, args.browser_runs)
+        print(f"⚡ HTTP path is {browser_mean / http_mean:.0f}x faster than the browser path")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
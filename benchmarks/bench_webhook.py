@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import db
+from http_client import client
+from webhook import WebhookServer
+from fake_telegram import FakeTelegram
+
+SECRET = "bench-secret"
+COMMANDS = ["/start", "/filters", "/filter bba", "/search অনার্স", "scrape", "hello"]
+
+
+def make_update(update_id, chat_id):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": {"id": chat_id, "first_name": "Bench"},
+            "chat": {"id": chat_id, "type": "private"},
+            "date": int(time.time()),
+            "text": random.choice(COMMANDS),
+        },
+    }
+
+
+async def post_all(port, bodies, latencies, statuses):
+    """One keep-alive connection POSTing its share of the burst, like one of Telegram's"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for body, secret in bodies:
+        started = time.perf_counter()
+        writer.write(
+            f"POST /telegram HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+            f"X-Telegram-Bot-Api-Secret-Token: {secret}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        if length:
+            await reader.readexactly(length)
+        latencies.append(time.perf_counter() - started)
+        status = int(status_line.split()[1])
+        statuses[status] = statuses.get(status, 0) + 1
+    writer.close()
+
+
+async def run(args, fake):
+    sent_url = f"{fake.api_base}/botBENCH/sendMessage"
+
+    def send(chat_id, text):
+        client.post(sent_url, json={"chat_id": chat_id, "text": text}, timeout=10)
+
+    server = WebhookServer(send, lambda requesters: ("dispatched", {}), secret=SECRET,
+                           workers=args.workers, processed_file=None)
+    _, port = await server.start("127.0.0.1", 0)
+
+    # The burst: unique updates, Telegram-style re-sends and a few forged requests
+    bodies = []
+    for update_id in range(1, args.updates + 1):
+        body = json.dumps(make_update(update_id, 700000 + update_id % args.chats)).encode()
+        bodies.append((body, SECRET))
+        if random.random() < args.duplicate_ratio:
+            bodies.append((body, SECRET))
+        if random.random() < args.forged_ratio:
+            bodies.append((body, "wrong-secret"))
+
+    shares = [bodies[i::args.connections] for i in range(args.connections)]
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    await asyncio.gather(*(post_all(port, share, latencies, statuses) for share in shares))
+    acked = time.perf_counter() - started
+    await server.drain()
+    handled = time.perf_counter() - started
+    await server.stop()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"\n📨 {len(bodies)} requests over {args.connections} connections, {args.workers} handler lanes")
+    print(f"   responses: {dict(sorted(statuses.items()))}")
+    print(f"   acked in {acked:.2f}s -> {len(bodies) / acked:,.0f} req/s "
+          f"(ack latency p50 {pct(0.5):.2f} ms, p99 {pct(0.99):.2f} ms, max {latencies[-1] * 1000:.2f} ms)")
+    print(f"   handled in {handled:.2f}s -> {server.stats['handled'] / handled:,.0f} updates/s")
+    print(f"   server stats: {server.stats}")
+    print(f"   replies seen by fake Telegram: {len(fake.sent)}")
+    assert server.stats["handled"] == args.updates, "every unique update must be handled exactly once"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the webhook receiver with a burst of updates")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=40, help="Telegram opens up to 40 per bot by default")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+    parser.add_argument("--forged-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="nu-webhook-bench-")
+    os.chdir(workdir)
+    db.DB_FILE = os.path.join(workdir, "nu_bot.db")
+    with FakeTelegram() as fake:
+        asyncio.run(run(args, fake))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+# ---------- Fake Telegram Bot API ----------
+
+class FakeTelegram:
+    """Local stand-in for api.telegram.org with injectable latency, 429s and blocked chats"""
+
+    def __init__(self, latency=0.0, rate_limit_ratio=0.0, retry_after=1, blocked_chats=()):
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.blocked_chats = {str(chat_id) for chat_id in blocked_chats}
+        self.sent = []
+        self.updates = []
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    @property
+    def api_base(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _params(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                if "json" in self.headers.get("Content-Type", ""):
+                    params.update(json.loads(body or "{}"))
+                else:
+                    params.update({k: v[0] for k, v in parse_qs(body).items()})
+                return params
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch()
+
+            def do_POST(self):
+                self._dispatch()
+
+            def _dispatch(self):
+                params = self._params()
+                method = urlparse(self.path).path.rsplit("/", 1)[-1]
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if method == "sendMessage":
+                    if str(params.get("chat_id")) in fake.blocked_chats:
+                        self._reply(403, {"ok": False, "error_code": 403,
+                                          "description": "Forbidden: bot was blocked by the user"})
+                        return
+                    if fake.rate_limit_ratio and random.random() < fake.rate_limit_ratio:
+                        with fake.lock:
+                            fake.rate_limited += 1
+                        self._reply(429, {
+                            "ok": False,
+                            "error_code": 429,
+                            "description": f"Too Many Requests: retry after {fake.retry_after}",
+                            "parameters": {"retry_after": fake.retry_after}
+                        })
+                        return
+                    with fake.lock:
+                        fake.sent.append((str(params.get("chat_id")), params.get("text", "")))
+                    self._reply(200, {"ok": True, "result": {"message_id": len(fake.sent)}})
+                elif method == "getUpdates":
+                    offset = int(params.get("offset", 0) or 0)
+                    limit = int(params.get("limit", 100) or 100)
+                    with fake.lock:
+                        batch = [u for u in fake.updates if u["update_id"] >= offset][:limit]
+                    self._reply(200, {"ok": True, "result": batch})
+                else:
+                    self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def add_message(self, chat_id, text, first_name="Tester"):
+        """Queue an incoming text message for getUpdates"""
+        with self.lock:
+            update_id = (self.updates[-1]["update_id"] + 1) if self.updates else 1
+            self.updates.append({
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "from": {"id": int(chat_id), "first_name": first_name},
+                    "chat": {"id": int(chat_id), "type": "private"},
+                    "date": int(time.time()),
+                    "text": text
+                }
+            })
+        return update_id
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
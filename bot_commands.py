@@ -0,0 +1,115 @@
+from subscribers import SubscriberStore
+from dispatcher import status_message
+from keyword_filters import FilterStore, handle_filter_command
+from search_index import SearchIndex, search_message
+
+WELCOME_TEXT = (
+    "👋 Welcome, {name}!\n\n"
+    "You are now subscribed to receive notifications "
+    "for new notices from National University 📢✨\n\n"
+    "You will receive notifications when new notices are published.\n"
+    "Only want some of them? Send /filter followed by keywords, e.g. /filter bba"
+)
+HELLO_TEXT = "👋 হ্যালো! 'scrape' লিখে পাঠাও GitHub workflow চালানোর জন্য।\nশুধু নির্দিষ্ট নোটিশ চাইলে: /filter bba, অনার্স"
+GOODBYE_TEXT = "🔕 You have been unsubscribed. Send /start to subscribe again."
+SEARCH_HELP_TEXT = "🔍 লিখে পাঠাও: /search <শব্দ>, যেমন /search অনার্স ৪র্থ বর্ষ"
+
+
+def _no_reply(chat_id, text):
+    pass
+
+
+def handle_updates(updates, send, dispatch, metrics=None, processed=None, replied=None):
+    """Answer every bot command in `updates`; shared by the listener and the scraper
+
+    Whichever process claims a batch from the UpdateFeed handles all of it,
+    so both must understand the full command set. `send(chat_id, text)`
+    replies, `dispatch(requesters)` starts (or joins) a scrape run, and
+    update_ids already in `processed` are skipped. Returns the handled IDs.
+
+    A caller that retries a failed batch passes the same `replied` set each
+    time: IDs are added once their replies went out, and on the retry those
+    updates only have their subscriber changes re-applied, silently.
+    """
+    subscribers = SubscriberStore()
+    filters = FilterStore()
+    search_index = None
+    scrape_requesters = {}
+    scrape_ids = []
+    handled = []
+
+    def count(name, value=1):
+        if metrics:
+            metrics.inc(name, value)
+
+    def answer(update, send, quiet):
+        """Apply one update's command; True if it asked for a scrape"""
+        nonlocal search_index
+        msg = update.get("message", {})
+        text = msg.get("text", "").strip()
+        chat_id = str(msg.get("chat", {}).get("id", ""))
+        first_name = msg.get("from", {}).get("first_name", "Friend")
+        if not chat_id or not text:
+            return False
+
+        command = text.lower()
+        print(f"📩 {first_name}: {command}")
+        count("messages_received")
+
+        if command in ("/start", "start"):
+            if subscribers.upsert(chat_id, first_name):
+                print(f"✅ New user registered: {chat_id} ({first_name})")
+                send(chat_id, WELCOME_TEXT.format(name=first_name))
+            else:
+                send(chat_id, HELLO_TEXT)
+        elif command in ("/stop", "/unsubscribe"):
+            if subscribers.unsubscribe(chat_id):
+                print(f"👋 User unsubscribed: {chat_id} ({first_name})")
+                send(chat_id, GOODBYE_TEXT)
+        elif command.startswith(("/filter", "/unfilter")):
+            reply = handle_filter_command(filters, chat_id, text)
+            if reply:
+                send(chat_id, reply)
+        elif command.partition(" ")[0] in ("/search", "search"):
+            query = command.partition(" ")[2].strip()
+            if not query:
+                send(chat_id, SEARCH_HELP_TEXT)
+            elif not quiet:
+                search_index = search_index or SearchIndex()
+                count("searches")
+                send(chat_id, search_message(query, search_index.search(query)))
+        elif command in ("scrape", "/scrape") and not quiet:
+            print(f"⚡ Scrape command received from {first_name} ({chat_id})")
+            # Collected here, answered together after one coalesced dispatch
+            scrape_requesters[chat_id] = first_name
+            return True
+        return False
+
+    for update in updates:
+        update_id = update["update_id"]
+        if processed is not None and update_id in processed:
+            continue
+        handled.append(update_id)
+        # This update's replies went out in an earlier attempt that then failed
+        quiet = replied is not None and update_id in replied
+        if answer(update, _no_reply if quiet else send, quiet):
+            scrape_ids.append(update_id)
+        elif replied is not None:
+            replied.add(update_id)
+
+    # 👉 সব scrape অনুরোধের জন্য একটাই GitHub workflow
+    if scrape_requesters:
+        count("scrape_requests", len(scrape_requesters))
+        status, info = dispatch(len(scrape_requesters))
+        count(f"dispatch_{status}")
+        reply = status_message(status, info, len(scrape_requesters))
+        for chat_id in scrape_requesters:
+            send(chat_id, reply)
+        if replied is not None:
+            replied.update(scrape_ids)
+
+    # Subscriber changes go out in one transaction
+    changed = subscribers.flush()
+    if changed:
+        print(f"✅ Subscribers saved ({changed} changes, {subscribers.count()} active)")
+    return handled
@@ -0,0 +1,159 @@
+import os
+import time
+import threading
+from http_client import client, request_not_sent
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configuration ---
+# Telegram allows a bot roughly 30 messages/sec overall and ~1 message/sec per chat
+GLOBAL_RATE = float(os.getenv("BROADCAST_GLOBAL_RATE", "30"))
+PER_CHAT_INTERVAL = float(os.getenv("BROADCAST_PER_CHAT_INTERVAL", "1"))
+MAX_WORKERS = int(os.getenv("BROADCAST_WORKERS", "8"))
+MAX_RETRIES = 3
+
+
+# ---------- Rate Limiters ----------
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all broadcast workers"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        # Small burst allowance so a full bucket never pushes a second over the limit
+        self.capacity = capacity or max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until one token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds` (used for 429 retry_after)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.updated = self.paused_until
+
+
+class PerChatLimiter:
+    """Keeps consecutive messages to the same chat at least `interval` apart"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_allowed = {}
+        self.lock = threading.Lock()
+
+    def wait(self, chat_id):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed.get(chat_id, 0.0))
+            self.next_allowed[chat_id] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Shared across calls so back-to-back broadcasts in one run respect the limits too
+global_bucket = TokenBucket(GLOBAL_RATE)
+chat_limiter = PerChatLimiter(PER_CHAT_INTERVAL)
+
+
+# ---------- Broadcast Engine ----------
+
+def _retry_after(response):
+    """Extract retry_after seconds from a Telegram 429 response"""
+    try:
+        return float(response.json().get("parameters", {}).get("retry_after", 1))
+    except Exception:
+        return float(response.headers.get("Retry-After", 1))
+
+
+def _deliver(send_url, chat_id, text, stats, stats_lock, on_result=None):
+    """Send one message, honoring the global bucket, per-chat limit and 429s"""
+    for attempt in range(MAX_RETRIES + 1):
+        chat_limiter.wait(chat_id)
+        global_bucket.acquire()
+        try:
+            # Retried here rather than in the client, so retries wait for the
+            # limiters and show up in the report
+            response = client.post(
+                send_url,
+                data={
+                    "chat_id": chat_id,
+                    "text": text,
+                    "disable_web_page_preview": True
+                },
+                timeout=15,
+                retries=0
+            )
+            if response.status_code == 429 and attempt < MAX_RETRIES:
+                delay = _retry_after(response)
+                print(f"⏳ Rate limited on {chat_id}, retrying after {delay}s")
+                global_bucket.pause(delay)
+                with stats_lock:
+                    stats["retried"] += 1
+                continue
+            response.raise_for_status()
+        except Exception as e:
+            error = e
+            # A timeout or 5xx may already have delivered the message; leave
+            # those to the outbox's backoff instead of sending again right away
+            if attempt < MAX_RETRIES and request_not_sent(e):
+                with stats_lock:
+                    stats["retried"] += 1
+                continue
+            break
+        # Delivered: outside the try, so an on_result error never counts it as failed too
+        with stats_lock:
+            stats["sent"] += 1
+        if on_result:
+            on_result(chat_id, True, None)
+        return True, None
+    with stats_lock:
+        stats["failed"] += 1
+    print(f"❌ Failed to send to {chat_id}: {error}")
+    if on_result:
+        on_result(chat_id, False, error)
+    return False, error
+
+
+def broadcast(send_url, chat_ids, text, workers=MAX_WORKERS, on_result=None):
+    """Send `text` to every chat in parallel and return a throughput report
+
+    `on_result(chat_id, ok, error)` is called from the worker threads as soon
+    as each delivery finishes, so callers can persist progress immediately.
+    """
+    chat_ids = list(chat_ids)
+    stats = {"sent": 0, "failed": 0, "retried": 0}
+    stats_lock = threading.Lock()
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chat_ids) or 1))) as pool:
+        results = list(pool.map(lambda cid: _deliver(send_url, cid, text, stats, stats_lock, on_result), chat_ids))
+
+    elapsed = time.monotonic() - started
+    report = dict(stats)
+    report["total"] = len(chat_ids)
+    report["elapsed"] = round(elapsed, 3)
+    report["throughput"] = round(stats["sent"] / elapsed, 2) if elapsed > 0 else 0.0
+    report["errors"] = {cid: err for cid, (ok, err) in zip(chat_ids, results) if not ok}
+    print(
+        f"📈 Broadcast report: {report['sent']}/{report['total']} sent, "
+        f"{report['failed']} failed, {report['retried']} retried "
+        f"in {report['elapsed']}s ({report['throughput']} msg/s)"
+    )
+    return report
@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import argparse
+from urllib.parse import urljoin
+from http_client import USER_AGENT
+from notice_parser import clean_text
+
+# --- Configuration ---
+BASE_URL = "https://www.nu.ac.bd/"
+ROW_SELECTOR = "table tbody tr"
+# Resource types the notice table never needs; BROWSER_BLOCK_RESOURCES="" loads everything
+BLOCKED_RESOURCE_TYPES = frozenset(
+    t.strip() for t in os.getenv("BROWSER_BLOCK_RESOURCES", "image,font,media,stylesheet").split(",") if t.strip()
+)
+NAVIGATION_TIMEOUT_MS = int(os.getenv("BROWSER_NAVIGATION_TIMEOUT_MS", "60000"))
+SELECTOR_TIMEOUT_MS = int(os.getenv("BROWSER_SELECTOR_TIMEOUT_MS", "30000"))
+
+# Runs inside the page: returns [{title, href, date}] for the first `limit` rows
+EXTRACT_ROWS_JS = """
+(rows, limit) => rows.slice(0, limit).map(row => {
+    const link = row.querySelector("td:first-child a");
+    const dateCell = row.querySelector("td:last-child");
+    return {
+        title: link ? link.innerText.trim() : "",
+        href: link ? (link.getAttribute("href") || "") : "",
+        date: dateCell ? dateCell.innerText.trim() : ""
+    };
+})
+"""
+
+
+def process_tree_rss():
+    """Resident memory of this process plus its children (Chromium runs as children), in bytes
+
+    Reads /proc, so it returns None where that is not available.
+    """
+    try:
+        parents, rss = {}, {}
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "rb") as f:
+                    # The command name may contain spaces; fields resume after its ')'
+                    fields = f.read().rsplit(b")", 1)[1].split()
+                with open(f"/proc/{entry}/statm", "rb") as f:
+                    rss[int(entry)] = int(f.read().split()[1]) * page_size
+            except (OSError, IndexError, ValueError):
+                continue
+            parents[int(entry)] = int(fields[1])
+    except OSError:
+        return None
+
+    tree, frontier = set(), [os.getpid()]
+    while frontier:
+        pid = frontier.pop()
+        tree.add(pid)
+        frontier.extend(child for child, parent in parents.items() if parent == pid and child not in tree)
+    return sum(rss.get(pid, 0) for pid in tree)
+
+
+class BrowserScraper:
+    """Headless Chromium kept alive across polls of the notice table
+
+    Launching Chromium costs far more than loading the page, so one browser
+    context is started on the first poll and reused until close(). Images,
+    fonts, media and stylesheets are aborted through request routing, and
+    each poll waits for the table rows rather than a fixed delay. Every
+    poll's latency and the process tree's RSS are kept in `polls`.
+    """
+
+    def __init__(self, base_url=BASE_URL, user_agent=USER_AGENT, blocked=BLOCKED_RESOURCE_TYPES, metrics=None):
+        self.base_url = base_url
+        self.user_agent = user_agent
+        self.blocked = frozenset(blocked)
+        self.metrics = metrics
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.blocked_requests = 0
+        self.polls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _count(self, name, value=1):
+        if self.metrics:
+            self.metrics.inc(name, value)
+
+    def _route(self, route):
+        if route.request.resource_type in self.blocked:
+            self.blocked_requests += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    def start(self):
+        if self.page is not None:
+            return
+        # Imported lazily so the HTTP fast path never pays for Playwright; a
+        # missing install fails this poll (reported by the caller), not the run
+        try:
+            from playwright.sync_api import sync_playwright
+        except ImportError as e:
+            raise RuntimeError("Playwright is not installed (pip install playwright && playwright install chromium)") from e
+
+        started = time.perf_counter()
+        self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(headless=True)
+        self.context = self.browser.new_context(user_agent=self.user_agent)
+        if self.blocked:
+            self.context.route("**/*", self._route)
+        self.page = self.context.new_page()
+        self._count("browser_launches")
+        print(f"🚀 Chromium started in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def close(self):
+        """Shut the browser down; the next poll launches a fresh one"""
+        for resource, stop in ((self.context, "close"), (self.browser, "close"), (self.playwright, "stop")):
+            if resource is not None:
+                try:
+                    getattr(resource, stop)()
+                except Exception as e:
+                    print(f"⚠️ Browser shutdown: {e}")
+        self.playwright = self.browser = self.context = self.page = None
+
+    def poll(self, limit):
+        """Load the homepage in the kept-alive page and return up to `limit` notices"""
+        started = time.perf_counter()
+        blocked_before = self.blocked_requests
+        try:
+            self.start()
+            self.page.goto(self.base_url, wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT_MS)
+            self.page.wait_for_selector(ROW_SELECTOR, timeout=SELECTOR_TIMEOUT_MS)
+            # Extract every row's title, link and date in one in-page evaluation
+            # instead of several locator round trips per row
+            rows = self.page.eval_on_selector_all(ROW_SELECTOR, EXTRACT_ROWS_JS, limit)
+        except Exception:
+            # A crashed or wedged browser is not reused
+            self.close()
+            self._count("browser_poll_errors")
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        rss = process_tree_rss()
+        blocked = self.blocked_requests - blocked_before
+        self.polls.append({"ms": elapsed_ms, "rss": rss, "blocked": blocked})
+        self._count("browser_polls")
+        self._count("browser_requests_blocked", blocked)
+        memory = f", RSS {rss / 1024 / 1024:.0f} MB" if rss is not None else ""
+        print(f"⏱️ Browser poll #{len(self.polls)}: {len(rows)} rows in {elapsed_ms:.0f} ms{memory} "
+              f"({blocked} requests blocked)")
+
+        return [
+            # Same whitespace handling as the HTTP parser, so switching paths changes no titles
+            {"title": clean_text(row["title"]), "url": urljoin(self.base_url, row["href"]), "date": clean_text(row["date"])}
+            for row in rows if row["href"] and clean_text(row["title"])
+        ]
+
+    def summary(self):
+        """Latency and memory over the polls so far"""
+        if not self.polls:
+            return {"polls": 0}
+        latencies = sorted(p["ms"] for p in self.polls)
+        rss = [p["rss"] for p in self.polls if p["rss"] is not None]
+        return {
+            "polls": len(self.polls),
+            "first_ms": round(self.polls[0]["ms"], 1),
+            "p50_ms": round(latencies[len(latencies) // 2], 1),
+            "max_ms": round(latencies[-1], 1),
+            "peak_rss_mb": round(max(rss) / 1024 / 1024, 1) if rss else None,
+            "blocked_requests": self.blocked_requests,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll the NU notice table with a kept-alive headless browser")
+    parser.add_argument("--polls", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0, help="seconds between polls")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--cold", action="store_true", help="launch a new browser per poll, for comparison")
+    parser.add_argument("--no-block", action="store_true", help="load images, fonts and stylesheets too")
+    args = parser.parse_args()
+
+    scraper = BrowserScraper(args.url, blocked=() if args.no_block else BLOCKED_RESOURCE_TYPES)
+    try:
+        for i in range(args.polls):
+            if i and args.interval:
+                time.sleep(args.interval)
+            try:
+                scraper.poll(args.limit)
+            except Exception as e:
+                print(f"❌ Browser poll failed: {e}")
+            if args.cold:
+                scraper.close()
+    finally:
+        scraper.close()
+    print(f"📊 {'cold' if args.cold else 'kept-alive'} browser: {scraper.summary()}")
+    return 0 if scraper.polls else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
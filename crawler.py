@@ -0,0 +1,77 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http_client import client, USER_AGENT
+from notice_parser import parse_notice_page
+
+# --- Configuration ---
+# Listings besides the homepage table: only the one the homepage links to. Add
+# category listings with NU_NOTICE_SOURCES='{"name": "url", ...}' once checked
+DEFAULT_SOURCES = {
+    "notices": "https://www.nu.ac.bd/recent-news-notice.php",
+}
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "4"))
+MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5"))
+ROWS_PER_PAGE = 200
+
+
+def load_sources():
+    raw = os.getenv("NU_NOTICE_SOURCES")
+    if raw:
+        return json.loads(raw)
+    return dict(DEFAULT_SOURCES)
+
+
+def _fetch_page(url):
+    response = client.get(url, headers={"User-Agent": USER_AGENT}, timeout=30)
+    response.raise_for_status()
+    if "charset" not in response.headers.get("Content-Type", "").lower():
+        response.encoding = "utf-8"
+    return parse_notice_page(response.text, url, ROWS_PER_PAGE)
+
+
+def crawl_source(name, url, is_known, max_pages=MAX_PAGES):
+    """Follow one listing's pagination until a stored URL (or the page cap) is reached
+
+    Listings are newest-first, so the first already-stored URL means every
+    row after it has been seen before.
+    """
+    found = []
+    pages = 0
+    while url and pages < max_pages:
+        try:
+            notices, next_url = _fetch_page(url)
+        except Exception as e:
+            print(f"⚠️ [{name}] Could not fetch {url}: {e}")
+            break
+        pages += 1
+        for notice in notices:
+            if is_known(notice["url"]):
+                print(f"🛑 [{name}] Reached stored notice on page {pages}, stopping")
+                return found, pages
+            notice["source"] = name
+            found.append(notice)
+        url = next_url
+    print(f"📄 [{name}] {len(found)} unseen notices in {pages} page(s)")
+    return found, pages
+
+
+def iter_crawl(is_known, sources=None, workers=CRAWL_WORKERS):
+    """Crawl every listing concurrently on a bounded pool, yielding unseen notices
+    as each listing finishes (URL-deduplicated across listings)"""
+    sources = sources if sources is not None else load_sources()
+    if not sources:
+        return
+    print(f"\n--- Crawling {len(sources)} notice listings ({workers} at a time) ---")
+    yielded = set()
+    total_pages = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sources)))) as pool:
+        futures = [pool.submit(crawl_source, name, url, is_known) for name, url in sources.items()]
+        for future in as_completed(futures):
+            found, pages = future.result()
+            total_pages += pages
+            for notice in found:
+                if notice["url"] not in yielded:
+                    yielded.add(notice["url"])
+                    yield notice
+    print(f"🕸️ Crawl finished: {len(yielded)} unseen notices from {total_pages} pages")
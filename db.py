@@ -0,0 +1,60 @@
+import os
+import json
+import sqlite3
+
+# --- Configuration ---
+DB_FILE = os.getenv("NU_BOT_DB", "nu_bot.db")
+
+
+def connect(path=None):
+    """Open the bot's SQLite state database (shared by all stores)"""
+    conn = sqlite3.connect(path or DB_FILE, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    return conn
+
+
+# ---------- Key/Value Metadata ----------
+
+def get_meta(conn, key, default=None):
+    """Read a JSON value from the meta table"""
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row["value"]) if row else default
+
+
+def set_meta(conn, key, value):
+    """Store a JSON-serializable value in the meta table"""
+    with conn:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+
+
+# ---------- Schema Migrations ----------
+
+def table_columns(conn, table):
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def add_columns(conn, table, columns, backfill=None):
+    """Add whichever of `columns` ({name: type}) `table` lacks; returns the added names
+
+    Processes opening an old database together would both ALTER and the
+    second would fail, so the schema is re-read under SQLite's write lock.
+    `backfill(added)` runs in the same transaction.
+    """
+    if columns.keys() <= table_columns(conn, table):
+        return set()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        added = set(columns) - table_columns(conn, table)
+        for name in columns:
+            if name in added:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {columns[name]}")
+        if added and backfill:
+            backfill(added)
+    return added
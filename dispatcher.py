@@ -0,0 +1,121 @@
+import os
+import time
+import db
+from http_client import client
+from db import connect, get_meta, set_meta
+from state import FileLock
+
+# --- Configuration ---
+GITHUB_OWNER = "fahim12064"
+GITHUB_REPO = "NU-Notice-Bot-Updated-"
+WORKFLOW_FILE = "main.yml"
+REF = "main"
+# Scrape requests within this many seconds of a dispatch share that run
+COALESCE_WINDOW = int(os.getenv("DISPATCH_COALESCE_WINDOW", "300"))
+ACTIVE_STATUSES = {"queued", "in_progress", "waiting", "requested", "pending"}
+STATE_KEY = "workflow_dispatch"
+# How long a request waits for another one's check-and-dispatch before sharing it
+LOCK_WAIT = float(os.getenv("DISPATCH_LOCK_WAIT", "10"))
+
+
+class WorkflowDispatcher:
+    """Coalesces "scrape" requests into at most one workflow_dispatch per window
+
+    Before dispatching it checks whether a run is already queued/in progress
+    and whether another dispatch happened within COALESCE_WINDOW (the state is
+    shared through nu_bot.db, so listener.py and test_code.py coalesce with
+    each other too). The check and the dispatch run under one file lock; a
+    request that cannot get it within LOCK_WAIT joins the dispatch in flight.
+    """
+
+    def __init__(self, token, conn=None, window=COALESCE_WINDOW, lock_wait=LOCK_WAIT):
+        self.token = token
+        self.conn = conn or connect()
+        self.window = window
+        self.lock_wait = lock_wait
+        self.api = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/actions/workflows/{WORKFLOW_FILE}"
+
+    @property
+    def headers(self):
+        return {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {self.token}",
+            "X-GitHub-Api-Version": "2022-11-28"
+        }
+
+    def active_run(self):
+        """The newest queued/in-progress run of the workflow, if any"""
+        try:
+            # Called under the dispatch lock, so one attempt: others are waiting
+            response = client.get(f"{self.api}/runs", headers=self.headers, params={"per_page": 5},
+                                  timeout=15, retries=0)
+            response.raise_for_status()
+            for run in response.json().get("workflow_runs", []):
+                if run.get("status") in ACTIVE_STATUSES:
+                    return {"id": run.get("id"), "status": run.get("status"), "url": run.get("html_url")}
+        except Exception as e:
+            print(f"⚠️ Could not check running workflows: {e}")
+        return None
+
+    def dispatch(self):
+        """Fire workflow_dispatch unconditionally; returns (success, status_code)"""
+        try:
+            response = client.post(f"{self.api}/dispatches", headers=self.headers, json={"ref": REF}, timeout=15)
+            print(f"🔹 Response: {response.status_code} | {response.text}")
+            return response.status_code == 204, response.status_code
+        except Exception as e:
+            print(f"❌ Error triggering workflow: {e}")
+            return False, str(e)
+
+    def request(self, requesters=1):
+        """Handle a batch of scrape requests; returns (status, info)
+
+        status is "running", "coalesced", "dispatched" or "failed".
+        """
+        if not self.token:
+            print("❌ GITHUB_TOKEN not set in secrets.")
+            return "failed", "no token"
+
+        # Check-then-dispatch must be atomic: webhook lanes, the listener and
+        # the scraper can all ask at once
+        lock = FileLock(f"{db.DB_FILE}.dispatch")
+        if not lock.acquire(self.lock_wait):
+            print(f"⏳ Another dispatch check is in progress, coalescing {requesters} request(s)")
+            return "coalesced", {"age": None}
+        try:
+            return self._request(requesters)
+        finally:
+            lock.release()
+
+    def _request(self, requesters):
+        run = self.active_run()
+        if run:
+            print(f"⏳ Workflow run {run['id']} already {run['status']}, sharing it with {requesters} requester(s)")
+            return "running", run
+
+        state = get_meta(self.conn, STATE_KEY, {})
+        age = time.time() - state.get("dispatched_at", 0)
+        if age < self.window:
+            print(f"⏳ Workflow dispatched {int(age)}s ago, coalescing {requesters} request(s)")
+            return "coalesced", {"age": int(age)}
+
+        print(f"🚀 Dispatching workflow for {requesters} requester(s)...")
+        success, code = self.dispatch()
+        if not success:
+            return "failed", code
+        set_meta(self.conn, STATE_KEY, {"dispatched_at": time.time(), "requesters": requesters})
+        return "dispatched", code
+
+
+def status_message(status, info, requesters=1):
+    """Reply text telling a requester what happened to the shared run"""
+    shared = f" ({requesters} জনের অনুরোধ একসাথে)" if requesters > 1 else ""
+    if status == "dispatched":
+        return f"✅ Workflow সফলভাবে চালু হয়েছে!{shared}"
+    if status == "running":
+        return f"⏳ একটি workflow ইতিমধ্যে চলছে ({info['status']}), নতুন notice সেখান থেকেই আসবে।{shared}\n{info['url'] or ''}".strip()
+    if status == "coalesced" and info["age"] is None:
+        return f"⏳ অন্য একটি অনুরোধ এই মুহূর্তে workflow চালু করছে, সেটার ফলাফলই পাবে।{shared}"
+    if status == "coalesced":
+        return f"⏳ {info['age']} সেকেন্ড আগে workflow চালু করা হয়েছে, সেটার ফলাফলই পাবে।{shared}"
+    return f"❌ Workflow চালু ব্যর্থ (Status: {info})"
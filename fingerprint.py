@@ -0,0 +1,142 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from http_client import client, USER_AGENT
+from notice_dates import normalize_date
+from notice_parser import clean_text
+from pipeline import build_messages
+
+# --- Configuration ---
+# Bytes of each PDF hashed; a re-upload almost always changes the first block or the length
+SAMPLE_BYTES = int(os.getenv("FINGERPRINT_SAMPLE_BYTES", "65536"))
+FINGERPRINT_WORKERS = int(os.getenv("FINGERPRINT_WORKERS", "4"))
+UPDATE_LABELS = {"title": "title", "date": "date", "pdf": "PDF file"}
+VALIDATORS = ("etag", "last_modified", "content_length")
+
+
+def notice_fingerprint(title, date_iso, content_hash):
+    """Stable hash of what subscribers see: title, date and the PDF itself"""
+    raw = "\x1f".join([clean_text(title), date_iso or "", content_hash or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def probe(url):
+    """HEAD validators for a PDF: {etag, last_modified, content_length}
+
+    Returns False when the file is gone (404/410) and None when HEAD gave no answer.
+    """
+    try:
+        response = client.request("HEAD", url, headers={"User-Agent": USER_AGENT}, allow_redirects=True)
+    except Exception as e:
+        print(f"⚠️ HEAD failed for {url}: {e}")
+        return None
+    if response.status_code in (404, 410):
+        return False
+    if response.status_code >= 400:
+        return None
+    length = response.headers.get("Content-Length")
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_length": int(length) if length and length.isdigit() else None,
+    }
+
+
+def sample_hash(url):
+    """Hash the first SAMPLE_BYTES of the PDF, using a Range request when the server honours it"""
+    headers = {"User-Agent": USER_AGENT, "Range": f"bytes=0-{SAMPLE_BYTES - 1}"}
+    try:
+        response = client.get(url, headers=headers, stream=True)
+        try:
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            remaining = SAMPLE_BYTES
+            # A server that ignores Range sends the whole file; stop reading early
+            for chunk in response.iter_content(chunk_size=16384):
+                digest.update(chunk[:remaining])
+                remaining -= len(chunk)
+                if remaining <= 0:
+                    break
+            return digest.hexdigest()
+        finally:
+            response.close()
+    except Exception as e:
+        print(f"⚠️ Could not sample {url}: {e}")
+        return None
+
+
+def _validators_match(stored, validators):
+    # Trust the server's validators only when it sent at least one of them
+    if not validators or not any(validators.values()):
+        return False
+    return all(stored[key] == validators[key] for key in VALIDATORS)
+
+
+class FingerprintIndex:
+    """Detects notices that were edited or re-uploaded under a URL we already stored
+
+    Title and date are compared for free against the scraped row; the PDF is
+    only HEAD-probed, and its bytes are only sampled when the HEAD validators
+    differ from the cached ones (or the server sends none). The first sighting
+    of a notice records a baseline silently.
+    """
+
+    def __init__(self, store, workers=FINGERPRINT_WORKERS):
+        self.store = store
+        self.workers = workers
+
+    def _inspect(self, notice, stored):
+        validators = probe(notice["url"])
+        if validators is False:
+            return notice, None, None
+        if stored["content_hash"] and _validators_match(stored, validators):
+            return notice, validators, stored["content_hash"]
+        return notice, validators, sample_hash(notice["url"])
+
+    def check(self, notices):
+        """Return [(notice, [changed fields])] for stored notices whose content changed"""
+        stored_rows = self.store.fingerprints(n["url"] for n in notices)
+        candidates = [(n, stored_rows[n["url"]]) for n in notices if n["url"] in stored_rows]
+        if not candidates:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(candidates)))) as pool:
+            inspected = list(pool.map(lambda pair: self._inspect(*pair), candidates))
+
+        changed = []
+        for (notice, validators, content_hash), (_, stored) in zip(inspected, candidates):
+            # Could not reach the PDF this time; keep what was cached
+            if validators is None:
+                validators = {key: stored[key] for key in VALIDATORS}
+            if content_hash is None:
+                content_hash = stored["content_hash"]
+            date_iso = normalize_date(notice["date"])
+            fingerprint = notice_fingerprint(notice["title"], date_iso, content_hash)
+            if fingerprint == stored["fingerprint"] and _validators_match(stored, validators):
+                continue
+
+            fields = []
+            if stored["fingerprint"]:
+                # The browser path keeps line breaks the HTTP parser collapses
+                if clean_text(notice["title"]) != clean_text(stored["title"]):
+                    fields.append("title")
+                if date_iso != stored["date_iso"]:
+                    fields.append("date")
+                # No earlier hash means the PDF was unreadable last time, not that it changed
+                if stored["content_hash"] and content_hash != stored["content_hash"]:
+                    fields.append("pdf")
+            if fields:
+                changed.append((notice, fields))
+            self.store.update_fingerprint(notice, date_iso, fingerprint, content_hash, validators)
+        return changed
+
+
+def _format_update(number, item):
+    notice, fields = item
+    what = ", ".join(UPDATE_LABELS[f] for f in fields)
+    return f"{number}. {notice['title']}\n   Changed: {what}\n   View Notice: {notice['url']}\n\n"
+
+
+def update_messages(today, changed):
+    """Telegram messages announcing notices that changed since they were first sent"""
+    return build_messages(today, changed, title="✏️ Updated Notices", formatter=_format_update)
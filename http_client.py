@@ -0,0 +1,135 @@
+import os
+import time
+import random
+import threading
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# --- Configuration ---
+# (connect, read) seconds; callers can still pass their own timeout
+DEFAULT_TIMEOUT = (5, 15)
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.5
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+# Identifies the bot to the NU site (homepage, listings, PDFs and the browser path)
+USER_AGENT = "Mozilla/5.0 (compatible; NU-Notice-Bot/1.0)"
+# Safe to repeat after a timeout or 5xx; anything else (sendMessage, workflow
+# dispatch) may already have taken effect
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def endpoint_label(url):
+    """Short, token-free name for latency counters, e.g. telegram.sendMessage"""
+    parsed = urlparse(url)
+    parts = [p for p in parsed.path.split("/") if p]
+    if len(parts) >= 2 and parts[0].startswith("bot"):
+        return f"telegram.{parts[-1]}"
+    if parsed.hostname == "api.github.com" and parts:
+        return f"github.{parts[-1]}"
+    return parsed.hostname or url
+
+
+def request_not_sent(error):
+    """True when `error` means the request never reached the server (so a retry cannot duplicate it)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and not isinstance(error, requests.Timeout):
+        # requests wraps urllib3's MaxRetryError, whose reason says what failed
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP client shared by the scraper, listener and broadcaster
+
+    Retries connection errors, timeouts and 5xx responses of idempotent
+    requests with jittered exponential backoff; other methods (POST) are
+    only retried when the connection could not be made. Keeps per-endpoint
+    call/latency counters.
+    Exposes get()/post() with the same arguments as requests.Session.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, max_retries=MAX_RETRIES):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.max_retries = max_retries
+        self.stats = {}
+        self.lock = threading.Lock()
+        # Callables (endpoint, elapsed_ms, status) notified after every attempt
+        self.observers = []
+
+    def _record(self, endpoint, elapsed, status, error=False, retry=False):
+        with self.lock:
+            s = self.stats.setdefault(endpoint, {"calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0})
+            s["calls"] += 1
+            s["errors"] += int(error)
+            s["retries"] += int(retry)
+            s["total_ms"] += elapsed * 1000
+            s["max_ms"] = max(s["max_ms"], elapsed * 1000)
+        for observer in self.observers:
+            observer(endpoint, elapsed * 1000, status)
+
+    def _backoff(self, attempt):
+        time.sleep(BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def request(self, method, url, retries=None, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        retries = self.max_retries if retries is None else retries
+        endpoint = endpoint_label(url)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                will_retry = attempt < retries and (idempotent or request_not_sent(e))
+                self._record(endpoint, time.perf_counter() - started, "error", error=True, retry=will_retry)
+                if not will_retry:
+                    raise
+                self._backoff(attempt)
+                continue
+            will_retry = response.status_code >= 500 and idempotent and attempt < retries
+            self._record(
+                endpoint, time.perf_counter() - started, response.status_code,
+                error=response.status_code >= 500, retry=will_retry
+            )
+            if not will_retry:
+                return response
+            self._backoff(attempt)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def latency_report(self):
+        """{endpoint: {calls, errors, retries, avg_ms, max_ms}}"""
+        with self.lock:
+            return {
+                endpoint: {
+                    "calls": s["calls"],
+                    "errors": s["errors"],
+                    "retries": s["retries"],
+                    "avg_ms": round(s["total_ms"] / s["calls"], 1) if s["calls"] else 0.0,
+                    "max_ms": round(s["max_ms"], 1)
+                }
+                for endpoint, s in sorted(self.stats.items())
+            }
+
+    def print_stats(self):
+        for endpoint, s in self.latency_report().items():
+            print(f"🌐 {endpoint}: {s['calls']} calls, {s['errors']} errors, "
+                  f"{s['retries']} retries, avg {s['avg_ms']} ms, max {s['max_ms']} ms")
+
+    def close(self):
+        self.session.close()
+
+
+# Shared instance: one connection pool per process
+client = HttpClient()
@@ -0,0 +1,231 @@
+import time
+import unicodedata
+from collections import deque
+from db import connect
+from notice_dates import BENGALI_DIGITS
+
+# --- Configuration ---
+MAX_FILTERS_PER_CHAT = 20
+# "/filter #honours" subscribes to every spelling NU uses for a category
+CATEGORIES = {
+    "honours": ["অনার্স", "honours", "hons"],
+    "degree": ["ডিগ্রী", "ডিগ্রি", "degree"],
+    "masters": ["মাস্টার্স", "masters"],
+    "preliminary": ["প্রিলিমিনারি", "প্রিলিমিনারী", "preliminary"],
+    "bba": ["বিবিএ", "bba"],
+    "bed": ["বি.এড", "বিএড", "b.ed"],
+    "cse": ["কম্পিউটার সায়েন্স", "cse"],
+    "admission": ["ভর্তি", "admission"],
+    "result": ["ফলাফল", "result"],
+    "exam": ["পরীক্ষা", "exam"],
+    "form": ["ফরম পূরণ", "form fill"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriber_filters (
+    chat_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (chat_id, keyword)
+);
+"""
+
+
+def normalize(text):
+    """Case-, digit- and composition-insensitive form used for patterns and titles"""
+    return unicodedata.normalize("NFC", text).translate(BENGALI_DIGITS).lower().strip()
+
+
+def expand(keyword):
+    """Patterns a stored filter stands for (a #category expands to its spellings)"""
+    if keyword.startswith("#"):
+        return [normalize(p) for p in CATEGORIES.get(keyword[1:], [])]
+    return [keyword]
+
+
+# ---------- Aho-Corasick Matcher ----------
+
+class AhoCorasick:
+    """Multi-pattern substring matcher: one pass over the text finds every pattern
+
+    Built once per run from all subscribers' keywords, so routing a notice
+    costs O(len(title) + matches) no matter how many filters exist.
+    """
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [set()]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._link()
+
+    def _add(self, pattern):
+        node = 0
+        for ch in pattern:
+            if ch not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(set())
+                self.goto[node][ch] = len(self.goto) - 1
+            node = self.goto[node][ch]
+        self.out[node].add(pattern)
+
+    def _link(self):
+        # Breadth-first, so every node's failure target is already linked
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                target = self.fail[node]
+                while target and ch not in self.goto[target]:
+                    target = self.fail[target]
+                self.fail[child] = self.goto[target].get(ch, 0)
+                self.out[child] |= self.out[self.fail[child]]
+
+    def find(self, text):
+        """Set of patterns occurring anywhere in `text`"""
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            if self.out[node]:
+                found |= self.out[node]
+        return found
+
+
+# ---------- Filter Storage ----------
+
+class FilterStore:
+    """Keyword/category filters per chat; chats without filters receive every notice"""
+
+    def __init__(self, conn=None):
+        self.conn = conn or connect()
+        self.conn.executescript(SCHEMA)
+
+    def list(self, chat_id):
+        rows = self.conn.execute(
+            "SELECT keyword FROM subscriber_filters WHERE chat_id = ? ORDER BY created_at", (str(chat_id),)
+        )
+        return [row["keyword"] for row in rows]
+
+    def add(self, chat_id, keywords):
+        """Add filters (already normalized); returns the ones that were new"""
+        existing = set(self.list(chat_id))
+        new = [k for k in dict.fromkeys(keywords) if k not in existing]
+        new = new[:max(0, MAX_FILTERS_PER_CHAT - len(existing))]
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO subscriber_filters (chat_id, keyword, created_at) VALUES (?, ?, ?)",
+                [(str(chat_id), k, now) for k in new]
+            )
+        return new
+
+    def remove(self, chat_id, keywords=None):
+        """Drop the given filters, or all of them; returns how many were removed"""
+        with self.conn:
+            if keywords is None:
+                cursor = self.conn.execute("DELETE FROM subscriber_filters WHERE chat_id = ?", (str(chat_id),))
+            else:
+                cursor = self.conn.executemany(
+                    "DELETE FROM subscriber_filters WHERE chat_id = ? AND keyword = ?",
+                    [(str(chat_id), k) for k in keywords]
+                )
+        return cursor.rowcount
+
+    def all(self):
+        """{chat_id: [keywords]} for every chat with at least one filter"""
+        filters = {}
+        for row in self.conn.execute("SELECT chat_id, keyword FROM subscriber_filters"):
+            filters.setdefault(row["chat_id"], []).append(row["keyword"])
+        return filters
+
+
+# ---------- Routing ----------
+
+class NoticeRouter:
+    """Splits a batch of notices into (chat_ids, notices) groups by subscriber filters"""
+
+    def __init__(self, filters):
+        self.filtered_chats = set(filters)
+        self.chats_by_pattern = {}
+        for chat_id, keywords in filters.items():
+            for keyword in keywords:
+                for pattern in expand(keyword):
+                    self.chats_by_pattern.setdefault(pattern, set()).add(chat_id)
+        self.matcher = AhoCorasick(self.chats_by_pattern)
+
+    @classmethod
+    def load(cls, conn=None):
+        return cls(FilterStore(conn).all())
+
+    def chats_for(self, notice):
+        """Filtered chats whose keywords occur in the notice title"""
+        chats = set()
+        for pattern in self.matcher.find(normalize(notice["title"])):
+            chats |= self.chats_by_pattern[pattern]
+        return chats
+
+    def route(self, notices, active_ids):
+        """[(chat_ids, notices)]: unfiltered chats get the whole batch, the rest only their matches"""
+        notices = list(notices)
+        per_chat = {}
+        for index, notice in enumerate(notices):
+            for chat_id in self.chats_for(notice):
+                per_chat.setdefault(chat_id, []).append(index)
+
+        # Chats that matched the same notices share one message
+        groups = {}
+        unfiltered = set(active_ids) - self.filtered_chats
+        if unfiltered:
+            groups[tuple(range(len(notices)))] = unfiltered
+        for chat_id, indexes in per_chat.items():
+            if chat_id in active_ids:
+                groups.setdefault(tuple(indexes), set()).add(chat_id)
+        return [(chat_ids, [notices[i] for i in indexes]) for indexes, chat_ids in groups.items()]
+
+
+# ---------- Bot Commands ----------
+
+def handle_filter_command(filters, chat_id, text):
+    """Reply for /filter, /filters and /unfilter (None if `text` is another command)
+
+    /filter bba, অনার্স    add keywords (comma separated) or #categories
+    /filters               list this chat's filters
+    /unfilter bba          remove one; "/unfilter" alone removes all
+    """
+    command, _, argument = text.strip().partition(" ")
+    command = command.lower().split("@", 1)[0]
+    keywords = [normalize(k) for k in argument.split(",") if normalize(k)]
+
+    if command == "/filter":
+        if not keywords:
+            return (
+                "🎯 Send /filter followed by keywords, e.g. /filter bba, অনার্স\n"
+                f"Categories: {', '.join('#' + c for c in CATEGORIES)}"
+            )
+        unknown = [k for k in keywords if k.startswith("#") and k[1:] not in CATEGORIES]
+        if unknown:
+            return f"❓ Unknown category: {', '.join(unknown)}"
+        added = filters.add(chat_id, keywords)
+        current = filters.list(chat_id)
+        if not added and len(current) >= MAX_FILTERS_PER_CHAT:
+            return f"⚠️ You already have {MAX_FILTERS_PER_CHAT} filters. Remove some with /unfilter."
+        return "✅ You will now only get notices matching: " + ", ".join(current)
+    if command == "/filters":
+        current = filters.list(chat_id)
+        if not current:
+            return "📢 No filters: you get every notice. Add one with /filter <keyword>."
+        return "🎯 Your filters: " + ", ".join(current)
+    if command == "/unfilter":
+        removed = filters.remove(chat_id, keywords or None)
+        current = filters.list(chat_id)
+        if not current:
+            return "📢 Filters cleared: you will get every notice again."
+        return f"🗑️ Removed {removed}. Remaining filters: " + ", ".join(current)
+    return None
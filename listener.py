@@ -1,140 +1,148 @@
 import os
-import requests
-import json
+import sys
+import signal
 import time
+from http_client import client
+from metrics import Metrics
+from update_tracker import ProcessedUpdates
+from update_feed import UpdateFeed
+from dispatcher import WorkflowDispatcher
+from bot_commands import handle_updates
 
 # --- Configuration ---
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-GITHUB_OWNER = "fahim12064"
-GITHUB_REPO = "NU-Notice-Bot-Updated-"
-WORKFLOW_FILE = "main.yml"
-REF = "main"
 
 PROCESSED_FILE = "processed_updates.json"  
-last_update_id = 0
+POLL_TIMEOUT = int(os.getenv("LISTENER_POLL_TIMEOUT", "30"))
+# The daemon rewrites its metrics files this often (and once more on shutdown)
+METRICS_INTERVAL = float(os.getenv("LISTENER_METRICS_INTERVAL", "300"))
+
+dispatcher = WorkflowDispatcher(GITHUB_TOKEN)
+feed = None
+metrics = Metrics("listener")
+stop_requested = False
+last_poll_ok = True
 
 
 # ---------------------------------------
 # 🔹 Utility: Load/Save processed IDs
 # ---------------------------------------
 def load_processed_ids():
-    """আগে যেসব update_id process হয়েছে সেগুলো ফাইল থেকে লোড করে।"""
-    if os.path.exists(PROCESSED_FILE):
-        try:
-            with open(PROCESSED_FILE, "r") as f:
-                return set(json.load(f))
-        except:
-            return set()
-    return set()
+    """আগে যেসব update_id process হয়েছে (high-water mark + সাম্প্রতিক window) লোড করে।"""
+    return ProcessedUpdates.load(PROCESSED_FILE)
 
 def save_processed_ids(ids):
-    """processed update_id ফাইল এ সংরক্ষণ করে।"""
-    with open(PROCESSED_FILE, "w") as f:
-        json.dump(list(ids), f)
+    """processed update_id ফাইল এ atomic ভাবে (temp file + rename) সংরক্ষণ করে।"""
+    ids.save(PROCESSED_FILE)
 
 
 # ---------------------------------------
 # 🔹 Trigger GitHub workflow
 # ---------------------------------------
-def trigger_github_workflow():
-    print("🚀 Attempting to trigger GitHub workflow...")
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/actions/workflows/{WORKFLOW_FILE}/dispatches"
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
-    data = {"ref": REF}
-
-    try:
-        response = requests.post(url, headers=headers, json=data, timeout=15)
-        print(f"🔹 Response: {response.status_code} | {response.text}")
-        return response.status_code == 204, response.status_code
-    except Exception as e:
-        print(f"❌ Error triggering workflow: {e}")
-        return False, str(e)
+def trigger_github_workflow(requesters=1):
+    """একাধিক scrape অনুরোধ মিলিয়ে একটাই workflow run; (status, info) ফেরত দেয়।"""
+    return dispatcher.request(requesters)
 
 
 # ---------------------------------------
 # 🔹 Telegram communication
 # ---------------------------------------
 def send_telegram_message(chat_id, text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    url = f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     try:
-        requests.post(url, json={"chat_id": chat_id, "text": text}, timeout=10)
+        client.post(url, json={"chat_id": chat_id, "text": text}, timeout=10)
+        metrics.inc("replies_sent")
         print(f"📨 Sent reply to {chat_id}")
     except Exception as e:
+        metrics.inc("replies_failed")
         print(f"❌ Send failed: {e}")
 
 
-def get_telegram_updates():
-    global last_update_id
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
-    params = {"offset": last_update_id + 1, "timeout": 30}
-    try:
-        response = requests.get(url, params=params, timeout=40)
-        if response.status_code == 200:
-            updates = response.json().get("result", [])
-            if updates:
-                last_update_id = updates[-1]["update_id"]
-                return updates
-    except Exception as e:
-        print(f"❌ Error fetching updates: {e}")
-    return []
+def get_feed():
+    """listener আর scraper একই UpdateFeed থেকে update নেয় (offset এর একটাই মালিক)।"""
+    global feed
+    if feed is None:
+        feed = UpdateFeed(TELEGRAM_API_BASE, TELEGRAM_BOT_TOKEN)
+    return feed
 
 
 # ---------------------------------------
 # 🔹 Process incoming messages
 # ---------------------------------------
-def process_messages():
-    updates = get_telegram_updates()
-    processed_ids = load_processed_ids()
-    new_processed = False
-
-    for update in updates:
-        update_id = update["update_id"]
-
-        # আগেই processed হলে skip করো
-        if update_id in processed_ids:
-            continue
+def process_messages(processed_ids=None):
+    """UpdateFeed থেকে একটা batch নিয়ে সব command handle করে; processed_ids ফেরত দেয়।"""
+    global last_poll_ok
+    if processed_ids is None:
+        with metrics.stage("load_state"):
+            processed_ids = load_processed_ids()
+
+    # অন্য process feed ধরে থাকলে তার long-poll শেষ হওয়া পর্যন্ত অপেক্ষা করো
+    feed = get_feed()
+    with feed.claim(timeout=POLL_TIMEOUT, wait=POLL_TIMEOUT + 15) as updates:
+        last_poll_ok = feed.ok
+        metrics.inc("updates_received", len(updates))
+        with metrics.stage("handle"):
+            handled = handle_updates(updates, send_telegram_message, trigger_github_workflow, metrics, processed_ids)
+
+        # offset সরার আগেই processed ID রাখো, যাতে crash হলে কিছু দুবার না চলে
+        if handled:
+            for update_id in handled:
+                processed_ids.add(update_id)
+            with metrics.stage("save_state"):
+                save_processed_ids(processed_ids)
+            print(f"💾 Processed updates saved (up to #{processed_ids.high_water}, {len(processed_ids)} in window).")
+
+    return processed_ids
 
-        # Process new message
-        if "message" in update and "text" in update["message"]:
-            msg = update["message"]
-            chat_id = msg["chat"]["id"]
-            text = msg["text"].strip().lower()
-            first_name = msg.get("from", {}).get("first_name", "বন্ধু")
 
-            print(f"📩 {first_name}: {text}")
+# ---------------------------------------
+# 🔹 Main loop
+# ---------------------------------------
+def request_stop(signum, frame):
+    """SIGTERM/SIGINT এ চলমান poll শেষ করে লুপ থেকে বের হও।"""
+    global stop_requested
+    stop_requested = True
+    print(f"🛑 Signal {signum} received, stopping after the current poll...")
 
-            if text in ["scrape", "/scrape"]:
-                send_telegram_message(chat_id, "🔄 Workflow চালু করা হচ্ছে...")
-                success, code = trigger_github_workflow()
-                if success:
-                    send_telegram_message(chat_id, "✅ Workflow সফলভাবে চালু হয়েছে!")
-                else:
-                    send_telegram_message(chat_id, f"❌ Workflow চালু ব্যর্থ (Status: {code})")
 
-            elif text in ["start", "/start"]:
-                send_telegram_message(chat_id, "👋 হ্যালো! 'scrape' লিখে পাঠাও GitHub workflow চালানোর জন্য।")
+def run_daemon():
+    """একটাই long-poll লুপ: pooled connection, offset আর processed IDs মেমরিতে থাকে।"""
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    print(f"🤖 Daemon started (long-poll {POLL_TIMEOUT}s). Waiting for new messages...")
 
-            # Process complete → ফাইলে রাখো
-            processed_ids.add(update_id)
-            new_processed = True
+    processed_ids = load_processed_ids()
+    metrics_written = time.monotonic()
+    while not stop_requested:
+        try:
+            processed_ids = process_messages(processed_ids)
+            if time.monotonic() - metrics_written >= METRICS_INTERVAL:
+                metrics.write()
+                metrics_written = time.monotonic()
+        except Exception as e:
+            print(f"❌ Poll cycle failed: {e}")
+            time.sleep(5)
+            continue
+        # নেটওয়ার্ক/API সমস্যায় একটু থেমে আবার চেষ্টা করো
+        if not last_poll_ok and not stop_requested:
+            time.sleep(5)
 
-    # যদি নতুন কিছু process হয়, তাহলে save করো
-    if new_processed:
-        save_processed_ids(processed_ids)
-        print(f"💾 Processed updates saved ({len(processed_ids)} total).")
+    metrics.write()
+    client.print_stats()
+    client.close()
+    print("👋 Daemon stopped cleanly.")
 
 
-# ---------------------------------------
-# 🔹 Main loop
-# ---------------------------------------
 def main():
+    if "--daemon" in sys.argv or os.getenv("LISTENER_DAEMON") == "1":
+        run_daemon()
+        return
     print("🤖 Bot started! Waiting for new messages...")
     process_messages()
+    client.print_stats()
+    metrics.write()
     print("Cycle finished.")
 
 
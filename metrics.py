@@ -0,0 +1,107 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from http_client import client
+
+# --- Configuration ---
+METRICS_DIR = os.getenv("METRICS_DIR", ".")
+# Set METRICS_PROMETHEUS=1 to also write <job>_metrics.prom (text exposition format)
+WRITE_PROMETHEUS = os.getenv("METRICS_PROMETHEUS") == "1"
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class Metrics:
+    """Per-run stage timings, counters and HTTP latency histograms
+
+    Stages accumulate wall time (a stage entered twice adds up), counters
+    are plain integers, and every call made through the shared HTTP client
+    lands in a per-endpoint latency histogram.
+    """
+
+    def __init__(self, job="nu_bot"):
+        self.job = job
+        self.started_at = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        client.observers.append(self.observe_http)
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe_http(self, endpoint, elapsed_ms, status):
+        with self.lock:
+            h = self.histograms.setdefault(endpoint, {"buckets": [0] * len(LATENCY_BUCKETS_MS), "count": 0, "sum_ms": 0.0})
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    h["buckets"][i] += 1
+            h["count"] += 1
+            h["sum_ms"] += elapsed_ms
+            key = f"http_calls.{endpoint}.{status}"
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def summary(self):
+        with self.lock:
+            return {
+                "job": self.job,
+                "started_at": self.started_at,
+                "duration_s": round(time.time() - self.started_at, 3),
+                "stages_s": {k: round(v, 4) for k, v in self.stages.items()},
+                "counters": dict(sorted(self.counters.items())),
+                "http_latency_ms": {
+                    endpoint: {
+                        "count": h["count"],
+                        "sum": round(h["sum_ms"], 1),
+                        "buckets": dict(zip((str(b) for b in LATENCY_BUCKETS_MS), h["buckets"]))
+                    }
+                    for endpoint, h in sorted(self.histograms.items())
+                }
+            }
+
+    def to_prometheus(self):
+        s = self.summary()
+        lines = [
+            "# TYPE nu_bot_run_duration_seconds gauge",
+            f'nu_bot_run_duration_seconds{{job="{self.job}"}} {s["duration_s"]}',
+            "# TYPE nu_bot_stage_seconds gauge",
+        ]
+        for stage, seconds in s["stages_s"].items():
+            lines.append(f'nu_bot_stage_seconds{{job="{self.job}",stage="{stage}"}} {seconds}')
+        lines.append("# TYPE nu_bot_events_total counter")
+        for name, value in s["counters"].items():
+            lines.append(f'nu_bot_events_total{{job="{self.job}",name="{name}"}} {value}')
+        lines.append("# TYPE nu_bot_http_latency_ms histogram")
+        for endpoint, h in s["http_latency_ms"].items():
+            for bound, count in h["buckets"].items():
+                lines.append(f'nu_bot_http_latency_ms_bucket{{job="{self.job}",endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'nu_bot_http_latency_ms_bucket{{job="{self.job}",endpoint="{endpoint}",le="+Inf"}} {h["count"]}')
+            lines.append(f'nu_bot_http_latency_ms_sum{{job="{self.job}",endpoint="{endpoint}"}} {h["sum"]}')
+            lines.append(f'nu_bot_http_latency_ms_count{{job="{self.job}",endpoint="{endpoint}"}} {h["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Write <job>_metrics.json (and .prom when enabled); returns the JSON path"""
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{self.job}_metrics.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+        if WRITE_PROMETHEUS:
+            with open(os.path.join(METRICS_DIR, f"{self.job}_metrics.prom"), "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+        stages = ", ".join(f"{k} {v:.2f}s" for k, v in self.stages.items())
+        print(f"📊 Metrics written to {path} ({stages})")
+        return path
@@ -0,0 +1,74 @@
+import re
+import unicodedata
+from datetime import date, timedelta
+from functools import lru_cache
+
+# --- Configuration ---
+CACHE_SIZE = 4096
+
+BENGALI_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "sept": 9,
+    "জানুয়ারি": 1, "জানুয়ারী": 1, "ফেব্রুয়ারি": 2, "ফেব্রুয়ারী": 2, "মার্চ": 3,
+    "এপ্রিল": 4, "মে": 5, "জুন": 6, "জুলাই": 7, "আগস্ট": 8, "আগষ্ট": 8,
+    "সেপ্টেম্বর": 9, "অক্টোবর": 10, "নভেম্বর": 11, "ডিসেম্বর": 12,
+}
+# Three-letter English abbreviations ("Oct 22, 2025")
+MONTHS.update({name[:3]: number for name, number in list(MONTHS.items()) if name.isascii()})
+# য় has both a precomposed and a decomposed spelling on the site; compare in NFC
+MONTHS = {unicodedata.normalize("NFC", name): number for name, number in MONTHS.items()}
+
+SEPARATORS = re.compile(r"[\s,./\-]+")
+NUMBER = re.compile(r"^(\d{1,4})(?:st|nd|rd|th)?$")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_date(date_str):
+    """Turn a notice date as printed by NU into 'YYYY-MM-DD' (None if unrecognised)
+
+    Handles English and Bengali month names, Bengali numerals and the numeric
+    day-first forms (22-10-2025, 22/10/25) as well as ISO dates. Results are
+    memoized: a listing repeats the same handful of dates on every row.
+    """
+    if not date_str:
+        return None
+    text = unicodedata.normalize("NFC", date_str).translate(BENGALI_DIGITS).strip().lower()
+    numbers = []
+    month = None
+    for token in SEPARATORS.split(text):
+        match = NUMBER.match(token)
+        if match:
+            numbers.append(int(match.group(1)))
+        elif token in MONTHS and month is None:
+            month = MONTHS[token]
+
+    if month is not None and len(numbers) >= 2:
+        # "October 22, 2025" / "22 October 2025": the year is the 4-digit one
+        years = [n for n in numbers if n >= 1000]
+        days = [n for n in numbers if n < 1000]
+        if not years or not days:
+            return None
+        year, day = years[0], days[0]
+    elif month is None and len(numbers) == 3:
+        if numbers[0] >= 1000:
+            year, month, day = numbers
+        else:
+            # Bangladesh writes dates day-first
+            day, month, year = numbers
+        if year < 100:
+            year += 2000
+    else:
+        return None
+
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def days_ago(days, today=None):
+    """ISO date `days` before today, for range queries such as the last week"""
+    return ((today or date.today()) - timedelta(days=days)).isoformat()
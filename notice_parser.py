@@ -0,0 +1,115 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Link texts that mark the "next page" control of a paginated listing
+NEXT_LABELS = {"next", "next »", "next ›", "»", "›", ">", ">>", "পরবর্তী"}
+
+
+# ---------- Static HTML Notice Table Parser ----------
+
+class NoticeTableParser(HTMLParser):
+    """Collects table body rows as lists of cells: {"text", "href", "link_text"}
+
+    Mirrors what the browser path reads with the "table tbody tr" selector:
+    header rows (inside <thead>) are skipped, cells keep their visible text
+    and the first link they contain.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.row = None
+        self.cell = None
+        self.in_thead = 0
+        self.in_link = False
+        # Pagination: href of the "next page" link, if the page has one
+        self.next_href = None
+        self.pending_link = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "thead":
+            self.in_thead += 1
+        elif tag == "tr" and not self.in_thead:
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = {"text": [], "href": None, "link_text": []}
+            self.row.append(self.cell)
+        elif tag == "a" and self.cell is not None and self.cell["href"] is None:
+            self.cell["href"] = dict(attrs).get("href") or ""
+            self.in_link = True
+        elif tag == "a" and self.cell is None:
+            attrs = dict(attrs)
+            if "next" in (attrs.get("rel") or "").lower() and self.next_href is None:
+                self.next_href = attrs.get("href")
+            else:
+                self.pending_link = {"href": attrs.get("href"), "text": []}
+        elif tag == "br" and self.cell is not None:
+            self.cell["text"].append(" ")
+            if self.in_link:
+                self.cell["link_text"].append(" ")
+
+    def handle_endtag(self, tag):
+        if tag == "thead":
+            self.in_thead = max(0, self.in_thead - 1)
+        elif tag == "a":
+            self.in_link = False
+            if self.pending_link is not None:
+                label = _clean(self.pending_link["text"]).lower()
+                if label in NEXT_LABELS and self.next_href is None:
+                    self.next_href = self.pending_link["href"]
+                self.pending_link = None
+        elif tag in ("td", "th"):
+            self.cell = None
+            self.in_link = False
+        elif tag == "tr" and self.row is not None:
+            self.rows.append(self.row)
+            self.row = None
+            self.cell = None
+
+    def handle_data(self, data):
+        if self.pending_link is not None:
+            self.pending_link["text"].append(data)
+        if self.cell is not None:
+            self.cell["text"].append(data)
+            if self.in_link:
+                self.cell["link_text"].append(data)
+
+
+def clean_text(text):
+    """Collapse runs of whitespace (newlines, double spaces) to single spaces"""
+    return " ".join(text.split())
+
+
+def _clean(parts):
+    return clean_text("".join(parts))
+
+
+def parse_notice_page(html, base_url, limit=20):
+    """Return (notices, next_page_url) for one page of a notice listing"""
+    parser = NoticeTableParser()
+    parser.feed(html)
+    parser.close()
+    next_url = urljoin(base_url, parser.next_href) if parser.next_href else None
+    return _notices_from_rows(parser.rows, base_url, limit), next_url
+
+
+def parse_notice_rows(html, base_url, limit=20):
+    """Extract up to `limit` notices ({"title", "url", "date"}) from the notice table"""
+    return parse_notice_page(html, base_url, limit)[0]
+
+
+def _notices_from_rows(rows, base_url, limit):
+    notices = []
+    for row in rows[:limit]:
+        if not row:
+            continue
+        first, last = row[0], row[-1]
+        title = _clean(first["link_text"])
+        href = first["href"]
+        if title and href:
+            notices.append({
+                "title": title,
+                "url": urljoin(base_url, href),
+                "date": _clean(last["text"])
+            })
+    return notices
@@ -0,0 +1,175 @@
+import io
+import os
+import csv
+import sys
+import time
+from db import connect, add_columns
+from notice_dates import normalize_date, days_ago
+from state import FileLock, write_atomic
+
+# --- Configuration ---
+CSV_FILE_NAME = "scraped_notices.csv"
+CSV_HEADER = ["Notice Title", "URL", "Date"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notices (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    added_at REAL NOT NULL
+);
+"""
+# Columns added after the first release; created on demand for older stores
+EXTRA_COLUMNS = {
+    "date_iso": "TEXT",
+    "fingerprint": "TEXT",
+    "content_hash": "TEXT",
+    "etag": "TEXT",
+    "last_modified": "TEXT",
+    "content_length": "INTEGER",
+}
+DATE_INDEX = "CREATE INDEX IF NOT EXISTS idx_notices_date_iso ON notices (date_iso)"
+
+
+class NoticeStore:
+    """Indexed archive of scraped notices keyed by URL
+
+    Membership checks hit the UNIQUE index instead of re-parsing the CSV, so
+    startup cost stays flat as the archive grows. The CSV is kept as an
+    append-only export for people browsing the repository.
+    """
+
+    def __init__(self, conn=None, csv_path=CSV_FILE_NAME):
+        self.conn = conn or connect()
+        self.csv_path = csv_path
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        if self.count() == 0 and csv_path and os.path.exists(csv_path):
+            self.import_csv(csv_path)
+
+    def _migrate(self):
+        def backfill(added):
+            if "date_iso" in added:
+                # Normalize dates once for stores that predate the column
+                rows = self.conn.execute("SELECT id, date FROM notices").fetchall()
+                self.conn.executemany(
+                    "UPDATE notices SET date_iso = ? WHERE id = ?",
+                    [(normalize_date(row["date"]), row["id"]) for row in rows]
+                )
+
+        add_columns(self.conn, "notices", EXTRA_COLUMNS, backfill)
+        self.conn.execute(DATE_INDEX)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM notices").fetchone()[0]
+
+    def contains(self, url):
+        return self.conn.execute("SELECT 1 FROM notices WHERE url = ?", (url,)).fetchone() is not None
+
+    def add_many(self, notices):
+        """Insert notices in a single transaction; returns only the newly added ones"""
+        added = []
+        now = time.time()
+        with self.conn:
+            for notice in notices:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO notices (url, title, date, added_at, date_iso) VALUES (?, ?, ?, ?, ?)",
+                    (notice["url"], notice["title"], notice["date"], now, normalize_date(notice["date"]))
+                )
+                if cursor.rowcount:
+                    added.append(notice)
+        if added and self.csv_path:
+            self._append_csv(added)
+        return added
+
+    def fingerprints(self, urls):
+        """{url: stored title/date/fingerprint/validators} for the stored subset of `urls`"""
+        urls = list(urls)
+        if not urls:
+            return {}
+        placeholders = ",".join("?" * len(urls))
+        rows = self.conn.execute(
+            "SELECT url, title, date_iso, fingerprint, content_hash, etag, last_modified, content_length "
+            f"FROM notices WHERE url IN ({placeholders})", urls
+        )
+        return {row["url"]: dict(row) for row in rows}
+
+    def update_fingerprint(self, notice, date_iso, fingerprint, content_hash, validators):
+        """Record a notice's current title/date and content fingerprint"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE notices SET title = ?, date = ?, date_iso = ?, fingerprint = ?, content_hash = ?, "
+                "etag = ?, last_modified = ?, content_length = ? WHERE url = ?",
+                (notice["title"], notice["date"], date_iso, fingerprint, content_hash,
+                 validators.get("etag"), validators.get("last_modified"), validators.get("content_length"),
+                 notice["url"])
+            )
+
+    def between(self, start, end=None):
+        """Notices dated from `start` to `end` inclusive (ISO strings), newest first
+
+        Served from the date_iso index; nothing is re-parsed.
+        """
+        end = end or "9999-12-31"
+        rows = self.conn.execute(
+            "SELECT title, url, date, date_iso FROM notices WHERE date_iso BETWEEN ? AND ? "
+            "ORDER BY date_iso DESC, id DESC",
+            (start, end)
+        )
+        return [dict(row) for row in rows]
+
+    def recent(self, days=7):
+        """Notices from the last `days` days, e.g. recent(7) for the past week"""
+        return self.between(days_ago(days))
+
+    def import_csv(self, path):
+        """One-time migration of an existing scraped_notices.csv (duplicates collapse)"""
+        rows = []
+        with FileLock(path, shared=True), open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 3 and row[1].strip().startswith("http"):
+                    date = row[2].strip()
+                    rows.append((row[1].strip(), row[0].strip(), date, 0.0, normalize_date(date)))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO notices (url, title, date, added_at, date_iso) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        print(f"📦 Imported {self.count()} notices from {path}")
+
+    def export_csv(self, path=None):
+        """Rewrite the CSV from the store (one row per URL, in insertion order)"""
+        path = path or self.csv_path
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(CSV_HEADER)
+        for row in self.conn.execute("SELECT title, url, date FROM notices ORDER BY id"):
+            writer.writerow([row["title"], row["url"], row["date"]])
+        with FileLock(path):
+            write_atomic(path, buffer.getvalue())
+        print(f"💾 Exported {self.count()} notices to {path}")
+
+    def _append_csv(self, notices):
+        # Appends from other processes (or pipeline threads) must not interleave
+        with FileLock(self.csv_path):
+            file_exists = os.path.exists(self.csv_path)
+            with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+                if not file_exists:
+                    writer.writerow(CSV_HEADER)
+                writer.writerows([n["title"], n["url"], n["date"]] for n in notices)
+                f.flush()
+                os.fsync(f.fileno())
+
+if __name__ == "__main__":
+    # python notice_store.py export [path]  -> regenerate the CSV from the store
+    # python notice_store.py recent [days]  -> list notices from the last N days
+    if len(sys.argv) >= 2 and sys.argv[1] == "export":
+        NoticeStore().export_csv(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "recent":
+        for notice in NoticeStore().recent(int(sys.argv[2]) if len(sys.argv) > 2 else 7):
+            print(f"{notice['date_iso']}  {notice['title']}\n            {notice['url']}")
+    else:
+        print("Usage: python notice_store.py export [path] | recent [days]")
@@ -0,0 +1,166 @@
+import os
+import time
+import uuid
+import hashlib
+import threading
+from db import connect, add_columns
+from broadcast import broadcast
+
+# --- Configuration ---
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "5"))
+# Wait in-run for retries due within this many seconds; later ones go to the next run
+MAX_INLINE_WAIT = float(os.getenv("OUTBOX_MAX_INLINE_WAIT", "60"))
+# Deliveries claimed per round, and how long a claim keeps other processes away;
+# a round must finish well inside the lease (500 chats at 30 msg/s is ~17s)
+CLAIM_BATCH = int(os.getenv("OUTBOX_CLAIM_BATCH", "500"))
+LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox_messages (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox_deliveries (
+    message_id INTEGER NOT NULL REFERENCES outbox_messages(id),
+    chat_id TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    PRIMARY KEY (message_id, chat_id)
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox_deliveries(status, next_attempt_at);
+"""
+# Columns added after the first release; created on demand for older databases
+EXTRA_COLUMNS = {
+    "claimed_by": "TEXT",
+    "lease_until": "REAL NOT NULL DEFAULT 0",
+}
+
+
+class Outbox:
+    """Durable (message, chat_id, status) queue so broadcasts can resume after a crash
+
+    status is one of: pending, sending, sent, failed (permanent error or out of
+    attempts). drain() claims rows as `sending` under its own owner id with a
+    lease, so overlapping runs never pick up the same delivery; rows whose
+    lease ran out (the owner crashed) become claimable again.
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn or connect()
+        self.conn.executescript(SCHEMA)
+        add_columns(self.conn, "outbox_deliveries", EXTRA_COLUMNS)
+        self.lock = threading.Lock()
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def enqueue(self, text, chat_ids, key=None):
+        """Queue `text` for every chat; re-queuing the same message never duplicates"""
+        key = key or hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO outbox_messages (key, text, created_at) VALUES (?, ?, ?)",
+                (key, text, time.time())
+            )
+            message_id = self.conn.execute(
+                "SELECT id FROM outbox_messages WHERE key = ?", (key,)
+            ).fetchone()["id"]
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO outbox_deliveries (message_id, chat_id) VALUES (?, ?)",
+                [(message_id, str(chat_id)) for chat_id in chat_ids]
+            )
+        return message_id
+
+    def claim(self, now=None, limit=CLAIM_BATCH):
+        """Take up to `limit` due deliveries for this Outbox, grouped by message
+
+        Selecting and marking happen in one write transaction, so a delivery
+        is handed to exactly one process until its lease expires.
+        """
+        now = now or time.time()
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                """SELECT d.message_id, m.text, d.chat_id FROM outbox_deliveries d
+                   JOIN outbox_messages m ON m.id = d.message_id
+                   WHERE (d.status = 'pending' AND d.next_attempt_at <= ?)
+                      OR (d.status = 'sending' AND d.lease_until <= ?)
+                   ORDER BY d.message_id LIMIT ?""",
+                (now, now, limit)
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE outbox_deliveries SET status = 'sending', claimed_by = ?, lease_until = ? "
+                "WHERE message_id = ? AND chat_id = ?",
+                [(self.owner, now + LEASE_SECONDS, row["message_id"], row["chat_id"]) for row in rows]
+            )
+        grouped = {}
+        for row in rows:
+            grouped.setdefault((row["message_id"], row["text"]), []).append(row["chat_id"])
+        return grouped
+
+    def next_retry_at(self):
+        row = self.conn.execute(
+            "SELECT MIN(next_attempt_at) AS t FROM outbox_deliveries WHERE status = 'pending'"
+        ).fetchone()
+        return row["t"]
+
+    def pending_count(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM outbox_deliveries WHERE status = 'pending'"
+        ).fetchone()[0]
+
+    def record(self, message_id, chat_id, ok, error=None):
+        """Persist one delivery result right away (called from broadcast workers)"""
+        with self.lock, self.conn:
+            if ok:
+                self.conn.execute(
+                    "UPDATE outbox_deliveries SET status = 'sent', attempts = attempts + 1, last_error = NULL, "
+                    "claimed_by = NULL WHERE message_id = ? AND chat_id = ?",
+                    (message_id, chat_id)
+                )
+                return
+            attempts = self.conn.execute(
+                "SELECT attempts FROM outbox_deliveries WHERE message_id = ? AND chat_id = ?",
+                (message_id, chat_id)
+            ).fetchone()["attempts"] + 1
+            status_code = getattr(getattr(error, "response", None), "status_code", None)
+            permanent = status_code is not None and 400 <= status_code < 500 and status_code != 429
+            status = "failed" if permanent or attempts >= MAX_ATTEMPTS else "pending"
+            next_attempt_at = time.time() + BACKOFF_BASE * (2 ** (attempts - 1))
+            self.conn.execute(
+                "UPDATE outbox_deliveries SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, "
+                "claimed_by = NULL WHERE message_id = ? AND chat_id = ?",
+                (status, attempts, next_attempt_at, str(error)[:500], message_id, chat_id)
+            )
+
+    def drain(self, send_url):
+        """Deliver everything that is due, retrying failures with exponential backoff
+
+        Deliveries are claimed CLAIM_BATCH at a time, so another run draining
+        the same outbox works on different chats instead of sending twice.
+        """
+        totals = {"sent": 0, "failed": 0, "retried": 0, "errors": {}}
+        while True:
+            due = self.claim()
+            if not due:
+                next_at = self.next_retry_at()
+                if next_at is None or next_at - time.time() > MAX_INLINE_WAIT:
+                    break
+                time.sleep(max(0.0, next_at - time.time()))
+                continue
+            for (message_id, text), chat_ids in due.items():
+                print(f"📤 Delivering message #{message_id} to {len(chat_ids)} pending chats")
+                report = broadcast(
+                    send_url, chat_ids, text,
+                    on_result=lambda cid, ok, err, mid=message_id: self.record(mid, cid, ok, err)
+                )
+                for k in ("sent", "failed", "retried"):
+                    totals[k] += report[k]
+                totals["errors"].update(report["errors"])
+        totals["pending"] = self.pending_count()
+        if totals["pending"]:
+            print(f"⏸️ {totals['pending']} deliveries left pending for the next run")
+        return totals
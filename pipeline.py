@@ -0,0 +1,187 @@
+import os
+import queue
+import threading
+from notice_store import NoticeStore
+from notice_dates import normalize_date
+
+# --- Configuration ---
+TELEGRAM_MESSAGE_LIMIT = 4096
+QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "50"))
+STORE_BATCH = 50
+_DONE = object()
+
+
+# ---------- Message Building ----------
+
+def format_notice(number, notice):
+    return f"{number}. {notice['title']}\n   View Notice: {notice['url']}\n\n"
+
+
+def build_messages(today, notices, start=1, limit=TELEGRAM_MESSAGE_LIMIT,
+                   title="🔔 New Notices Found", formatter=format_notice):
+    """Render notices into as few messages as possible, each under Telegram's limit"""
+    header = f"📅 Date: {today}\n\n{title}\n\n"
+    messages = []
+    current = header
+    for number, notice in enumerate(notices, start):
+        entry = formatter(number, notice)
+        if len(header) + len(entry) > limit:
+            entry = entry[:limit - len(header) - 3] + "…\n\n"
+        if len(current) + len(entry) > limit:
+            messages.append(current)
+            current = header
+        current += entry
+    if current != header:
+        messages.append(current)
+    return messages
+
+
+# ---------- Streaming Pipeline ----------
+
+class NoticePipeline:
+    """scrape -> dedup -> deliver, connected by bounded queues
+
+    The caller's thread produces rows; a dedup thread drops known URLs and
+    stores older notices in batches; a delivery thread sends today's new
+    notices as soon as they arrive, coalescing whatever is already waiting
+    into one (chunked) message. Full queues block the stage upstream, so a
+    slow broadcast throttles extraction instead of buffering everything.
+    """
+
+    def __init__(self, today, queue_message, deliver, metrics=None, route=None):
+        self.today = today
+        self.queue_message = queue_message
+        self.deliver = deliver
+        # batch -> [(chat_ids, notices)]; by default everyone gets the whole batch
+        self.route = route or (lambda batch: [(None, batch)])
+        self.metrics = metrics
+        self.rows = queue.Queue(QUEUE_SIZE)
+        self.outgoing = queue.Queue(QUEUE_SIZE)
+        self.stats = {"rows": 0, "seen": 0, "new": 0, "today_new": 0, "messages": 0}
+        self.error = None
+        self.lock = threading.Lock()
+        self.workers = {}
+
+    def _count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+
+    def _put(self, q, item):
+        # Block for backpressure, but give up if a downstream stage died
+        while self.error is None:
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _finish(self, q, consumer):
+        # Hand the end marker to `consumer` unless it has already stopped
+        while self.workers[consumer].is_alive():
+            try:
+                q.put(_DONE, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _stage(self, name):
+        return self.metrics.stage(name) if self.metrics else _NullStage()
+
+    def _dedup_worker(self):
+        try:
+            store = NoticeStore()
+            in_run = set()
+            older = []
+            while True:
+                notice = self.rows.get()
+                if notice is _DONE:
+                    break
+                with self._stage("dedup"):
+                    if notice["url"] in in_run:
+                        continue
+                    in_run.add(notice["url"])
+                    if store.contains(notice["url"]):
+                        self._count("seen")
+                        continue
+                    self._count("new")
+                    is_today = normalize_date(notice["date"]) == self.today
+                if is_today:
+                    self._count("today_new")
+                    self._put(self.outgoing, notice)
+                else:
+                    older.append(notice)
+                    if len(older) >= STORE_BATCH:
+                        with self._stage("store"):
+                            store.add_many(older)
+                        older = []
+            if older:
+                with self._stage("store"):
+                    store.add_many(older)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._finish(self.outgoing, "delivery")
+
+    def _delivery_worker(self):
+        try:
+            store = NoticeStore()
+            done = False
+            while not done:
+                batch = [self.outgoing.get()]
+                # Coalesce everything that is already waiting into this send
+                while True:
+                    try:
+                        batch.append(self.outgoing.get_nowait())
+                    except queue.Empty:
+                        break
+                done = _DONE in batch
+                batch = [n for n in batch if n is not _DONE]
+                if not batch:
+                    continue
+
+                with self._stage("route"):
+                    groups = self.route(batch)
+                print(f"\n--- Sending {len(batch)} New Notices for {self.today} to {len(groups)} audience(s) ---")
+                # Queue first, then record the notices, then send: a rerun after a
+                # crash resumes the queued deliveries instead of re-sending them
+                queued = 0
+                for chat_ids, notices in groups:
+                    for message in build_messages(self.today, notices):
+                        self.queue_message(message, chat_ids)
+                        queued += 1
+                with self._stage("store"):
+                    store.add_many(batch)
+                self.deliver()
+                self._count("messages", queued)
+        except Exception as e:
+            self.error = e
+
+    def run(self, notices):
+        """Feed `notices` (any iterable, consumed lazily) through the pipeline"""
+        self.workers = {
+            "dedup": threading.Thread(target=self._dedup_worker, name="dedup"),
+            "delivery": threading.Thread(target=self._delivery_worker, name="delivery"),
+        }
+        for worker in self.workers.values():
+            worker.start()
+        try:
+            for notice in notices:
+                self._count("rows")
+                if not self._put(self.rows, notice):
+                    break
+        finally:
+            self._finish(self.rows, "dedup")
+            for worker in self.workers.values():
+                worker.join()
+        if self.error:
+            raise self.error
+        return dict(self.stats)
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
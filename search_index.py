@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import time
+import hashlib
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from http_client import client, USER_AGENT
+from db import connect, add_columns
+from notice_dates import BENGALI_DIGITS
+from notice_store import NoticeStore
+
+# --- Configuration ---
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "pdf_cache")
+# Notices indexed per run; the backlog is worked off a batch at a time
+INDEX_BATCH = int(os.getenv("SEARCH_INDEX_BATCH", "50"))
+DOWNLOAD_WORKERS = int(os.getenv("PDF_DOWNLOAD_WORKERS", "4"))
+EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+MAX_PDF_BYTES = 20 * 1024 * 1024
+# A failed download is tried again after RETRY_BASE * 2^n seconds, up to MAX_DOWNLOAD_ATTEMPTS times
+MAX_DOWNLOAD_ATTEMPTS = int(os.getenv("PDF_DOWNLOAD_ATTEMPTS", "5"))
+RETRY_BASE = 3600
+SEARCH_LIMIT = 5
+
+# Latin words/numbers, or runs of Bengali script (letters, vowel signs, virama)
+TOKEN = re.compile(r"[a-z0-9]+|[\u0980-\u09ff]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_docs (
+    notice_id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_terms (
+    term TEXT NOT NULL,
+    notice_id INTEGER NOT NULL,
+    PRIMARY KEY (term, notice_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_search_terms_notice ON search_terms (notice_id);
+"""
+# Columns added after the first release; created on demand for older databases
+EXTRA_COLUMNS = {
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "retry_at": "REAL NOT NULL DEFAULT 0",
+}
+
+# Never indexed, or a download failed and its retry time has come
+PENDING = (
+    "FROM notices n LEFT JOIN search_docs d ON d.notice_id = n.id "
+    "WHERE d.notice_id IS NULL OR (d.status = 'download_failed' AND d.attempts < ? AND d.retry_at <= ?)"
+)
+
+
+def tokenize(text):
+    """Distinct search terms of a Bengali/English text (Bengali digits folded to ASCII)"""
+    text = unicodedata.normalize("NFC", text).translate(BENGALI_DIGITS).lower()
+    return set(TOKEN.findall(text))
+
+
+def cache_path(url):
+    return os.path.join(PDF_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".pdf")
+
+
+def download_pdf(url):
+    """Fetch a PDF once into the on-disk cache; returns its path (None on failure)"""
+    path = cache_path(url)
+    if os.path.exists(path):
+        return path
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        response = client.get(url, headers={"User-Agent": USER_AGENT}, stream=True, timeout=(5, 60))
+        try:
+            response.raise_for_status()
+            size = 0
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    size += len(chunk)
+                    if size > MAX_PDF_BYTES:
+                        raise ValueError(f"larger than {MAX_PDF_BYTES // (1024 * 1024)} MB")
+                    f.write(chunk)
+        finally:
+            response.close()
+        os.replace(tmp_path, path)
+        return path
+    except Exception as e:
+        print(f"⚠️ Could not download {url}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+
+def extract_text(path):
+    """Text of every page (runs in a worker process; empty without pypdf)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return ""
+    try:
+        reader = PdfReader(path)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    except Exception as e:
+        print(f"⚠️ Could not read {path}: {e}")
+        return ""
+
+
+class SearchIndex:
+    """Incremental inverted index over notice titles and PDF text
+
+    Each notice is indexed once: its PDF is downloaded into PDF_CACHE_DIR,
+    text is extracted in a process pool (pypdf is optional; without it only
+    titles are indexed) and its terms are written to search_terms. Queries
+    only touch the term index, never the PDFs.
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn or connect()
+        self.conn.executescript(SCHEMA)
+        add_columns(self.conn, "search_docs", EXTRA_COLUMNS)
+        # Searches join on notices.date_iso; make sure the table is migrated
+        NoticeStore(self.conn)
+
+    def pending(self, limit=INDEX_BATCH):
+        rows = self.conn.execute(
+            f"SELECT n.id, n.url, n.title, COALESCE(d.attempts, 0) AS attempts {PENDING} "
+            "ORDER BY n.id DESC LIMIT ?",
+            (MAX_DOWNLOAD_ATTEMPTS, time.time(), limit)
+        )
+        return [dict(row) for row in rows]
+
+    def pending_count(self):
+        return self.conn.execute(
+            f"SELECT COUNT(*) {PENDING}", (MAX_DOWNLOAD_ATTEMPTS, time.time())
+        ).fetchone()[0]
+
+    def index_pending(self, limit=INDEX_BATCH):
+        """Download, extract and index up to `limit` not-yet-indexed notices"""
+        docs = self.pending(limit)
+        if not docs:
+            return 0
+        started = time.perf_counter()
+        pdf_docs = [d for d in docs if d["url"].lower().endswith(".pdf")]
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+            paths = dict(zip((d["id"] for d in pdf_docs), pool.map(lambda d: download_pdf(d["url"]), pdf_docs)))
+
+        to_extract = [(notice_id, path) for notice_id, path in paths.items() if path]
+        texts = {}
+        if to_extract:
+            with ProcessPoolExecutor(max_workers=max(1, min(EXTRACT_WORKERS, len(to_extract)))) as pool:
+                for (notice_id, _), text in zip(to_extract, pool.map(extract_text, [p for _, p in to_extract])):
+                    texts[notice_id] = text
+
+        now = time.time()
+        with self.conn:
+            for doc in docs:
+                attempts, retry_at = 0, 0
+                if doc["id"] in texts:
+                    status = "pdf" if texts[doc["id"]] else "title"
+                elif doc["id"] not in paths:
+                    status = "no_pdf"
+                else:
+                    # The title is indexed now; the PDF is tried again later
+                    status = "download_failed"
+                    attempts = doc["attempts"] + 1
+                    retry_at = now + RETRY_BASE * 2 ** (attempts - 1)
+                terms = tokenize(doc["title"]) | tokenize(texts.get(doc["id"], ""))
+                self.conn.execute("DELETE FROM search_terms WHERE notice_id = ?", (doc["id"],))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO search_terms (term, notice_id) VALUES (?, ?)",
+                    ((term, doc["id"]) for term in terms)
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO search_docs (notice_id, status, indexed_at, attempts, retry_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (doc["id"], status, now, attempts, retry_at)
+                )
+        print(f"🔍 Indexed {len(docs)} notices ({len(texts)} PDFs read) in {time.perf_counter() - started:.2f}s")
+        return len(docs)
+
+    def invalidate(self, url):
+        """Forget a notice's cached PDF and terms so the next run re-indexes it"""
+        path = cache_path(url)
+        if os.path.exists(path):
+            os.remove(path)
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM search_docs WHERE notice_id = (SELECT id FROM notices WHERE url = ?)", (url,)
+            )
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Notices containing every term of `query`, newest first"""
+        terms = sorted(tokenize(query))
+        if not terms:
+            return []
+        placeholders = ",".join("?" * len(terms))
+        rows = self.conn.execute(
+            f"SELECT n.title, n.url, n.date FROM notices n JOIN ("
+            f"  SELECT notice_id FROM search_terms WHERE term IN ({placeholders})"
+            f"  GROUP BY notice_id HAVING COUNT(*) = ?"
+            f") hits ON hits.notice_id = n.id "
+            f"ORDER BY n.date_iso DESC, n.id DESC LIMIT ?",
+            (*terms, len(terms), limit)
+        )
+        return [dict(row) for row in rows]
+
+
+def search_message(query, results):
+    """Telegram reply for /search"""
+    if not results:
+        return f"🔍 '{query}' এর জন্য কোনো নোটিশ পাওয়া যায়নি।"
+    message = f"🔍 '{query}' এর ফলাফল:\n\n"
+    for i, notice in enumerate(results, 1):
+        message += f"{i}. {notice['title']}\n   📅 {notice['date']}\n   View Notice: {notice['url']}\n\n"
+    return message
+
+
+if __name__ == "__main__":
+    # python search_index.py build        -> index the whole backlog
+    # python search_index.py search terms -> query the index
+    if len(sys.argv) >= 2 and sys.argv[1] == "build":
+        index = SearchIndex()
+        while index.index_pending():
+            print(f"   {index.pending_count()} left")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "search":
+        query = " ".join(sys.argv[2:])
+        print(search_message(query, SearchIndex().search(query)))
+    else:
+        print("Usage: python search_index.py build | search <terms>")
@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no flock; state files are then only protected by atomic renames
+    fcntl = None
+
+# --- Configuration ---
+LOCK_TIMEOUT = float(os.getenv("STATE_LOCK_TIMEOUT", "60"))
+LOCK_POLL_INTERVAL = 0.05
+
+
+class FileLock:
+    """Advisory cross-process lock on `<path>.lock` (flock), usable as a context manager
+
+    Each FileLock opens its own descriptor, so it also serializes threads of
+    the same process. Entering it waits up to LOCK_TIMEOUT and then raises
+    TimeoutError; acquire(timeout=0) just tries once.
+    """
+
+    def __init__(self, path, shared=False):
+        self.lock_path = f"{path}.lock"
+        self.shared = shared
+        self.file = None
+
+    def acquire(self, timeout=LOCK_TIMEOUT):
+        """Take the lock; returns False if it is still held elsewhere after `timeout` seconds"""
+        self.file = open(self.lock_path, "a")
+        if fcntl is None:
+            return True
+        mode = (fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX) | fcntl.LOCK_NB
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(self.file, mode)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self.file.close()
+                    self.file = None
+                    return False
+                time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self):
+        if self.file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"Timed out after {LOCK_TIMEOUT}s waiting for {self.lock_path}")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# ---------- Atomic Writes ----------
+
+def write_atomic(path, text):
+    """Write text to a temp file in the same directory, fsync, then rename over `path`
+
+    Readers see either the old or the new file, never a half-written one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomic(path, data):
+    write_atomic(path, json.dumps(data, ensure_ascii=False))
+
+
+def read_json(path, default=None):
+    """Load a JSON state file, falling back to `default` if it is missing or unreadable"""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read {path}: {e}")
+        return default
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+from db import connect, get_meta, set_meta
+from state import FileLock, write_atomic
+
+# --- Configuration ---
+# Still exported on every flush: a runner that only commits the text files
+# (not nu_bot.db) re-imports its subscribers from here on the next run
+USER_IDS_FILE = "user_ids.json"
+LEGACY_LAST_UPDATE_FILE = "last_update_id.txt"
+# Where the imported last_update_id.txt offset goes; UpdateFeed picks it up once
+OFFSET_KEY = "scraper_offset"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    chat_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    active INTEGER NOT NULL DEFAULT 1,
+    reason TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_subscribers_active ON subscribers(active);
+"""
+
+# Telegram descriptions that mean a chat will never accept messages again
+DEAD_CHAT_MARKERS = (
+    "bot was blocked by the user",
+    "user is deactivated",
+    "bot was kicked",
+    "chat not found",
+    "have no rights to send",
+    "group chat was upgraded",
+)
+
+
+class SubscriberStore:
+    """Single indexed subscriber registry (replaces user_ids.json + last_update_id.txt)
+
+    Changes are buffered with upsert()/unsubscribe() and written in one
+    transaction by flush(), so a run costs at most one write. Each flush
+    also rewrites user_ids.json with the active IDs, the way notices are
+    still exported to scraped_notices.csv.
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn or connect()
+        self.conn.executescript(SCHEMA)
+        self.pending = {}
+        if not get_meta(self.conn, "subscribers_migrated"):
+            self._import_legacy()
+
+    # ----- reads -----
+
+    def get(self, chat_id):
+        chat_id = str(chat_id)
+        if chat_id in self.pending:
+            return self.pending[chat_id]
+        row = self.conn.execute(
+            "SELECT chat_id, name, active, reason FROM subscribers WHERE chat_id = ?", (chat_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def is_active(self, chat_id):
+        row = self.get(chat_id)
+        return bool(row and row["active"])
+
+    def active_ids(self):
+        ids = {row["chat_id"] for row in self.conn.execute("SELECT chat_id FROM subscribers WHERE active = 1")}
+        for chat_id, row in self.pending.items():
+            (ids.add if row["active"] else ids.discard)(chat_id)
+        return ids
+
+    def count(self):
+        return len(self.active_ids())
+
+    # ----- buffered writes -----
+
+    def upsert(self, chat_id, name=""):
+        """Subscribe (or re-subscribe) a chat; returns True if it was not active before"""
+        was_active = self.is_active(chat_id)
+        self.pending[str(chat_id)] = {"chat_id": str(chat_id), "name": name, "active": 1, "reason": None}
+        return not was_active
+
+    def unsubscribe(self, chat_id, reason="unsubscribed"):
+        """Deactivate a chat; returns True if it was active"""
+        current = self.get(chat_id)
+        if not current or not current["active"]:
+            return False
+        self.pending[str(chat_id)] = {"chat_id": str(chat_id), "name": current["name"], "active": 0, "reason": reason}
+        return True
+
+    def flush(self):
+        """Write all buffered changes in a single transaction"""
+        if not self.pending:
+            return 0
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO subscribers (chat_id, name, active, reason, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET name = excluded.name, active = excluded.active, "
+                "reason = excluded.reason, updated_at = excluded.updated_at",
+                [(r["chat_id"], r["name"], r["active"], r["reason"], now) for r in self.pending.values()]
+            )
+        written = len(self.pending)
+        self.pending = {}
+        self._export()
+        return written
+
+    def _export(self):
+        """Rewrite user_ids.json atomically with the active chat IDs"""
+        with FileLock(USER_IDS_FILE):
+            write_atomic(USER_IDS_FILE, json.dumps(sorted(self.active_ids()), indent=2))
+
+    def purge_dead(self, errors):
+        """Deactivate chats whose send error says they are blocked/deleted; returns the count"""
+        purged = 0
+        for chat_id, error in errors.items():
+            reason = dead_chat_reason(error)
+            if reason and self.unsubscribe(chat_id, reason):
+                print(f"🧹 Removed dead chat {chat_id}: {reason}")
+                purged += 1
+        self.flush()
+        return purged
+
+    # ----- migration -----
+
+    def _import_legacy(self):
+        """One-time import of user_ids.json (active list) and last_update_id.txt (offset + names)"""
+        active, names, offset = set(), {}, 0
+        if os.path.exists(USER_IDS_FILE):
+            try:
+                with FileLock(USER_IDS_FILE, shared=True), open(USER_IDS_FILE, "r", encoding="utf-8") as f:
+                    active = {str(i) for i in json.load(f)}
+            except (OSError, ValueError) as e:
+                print(f"Error loading user IDs: {e}")
+        if os.path.exists(LEGACY_LAST_UPDATE_FILE):
+            with FileLock(LEGACY_LAST_UPDATE_FILE, shared=True), open(LEGACY_LAST_UPDATE_FILE, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            if lines and lines[0].isdigit():
+                offset = int(lines[0])
+            for line in lines[1:]:
+                parts = line.split(",", 1)
+                if len(parts) == 2:
+                    names[parts[0]] = parts[1]
+
+        for chat_id in active | set(names):
+            self.pending[chat_id] = {
+                "chat_id": chat_id,
+                "name": names.get(chat_id, ""),
+                "active": 1 if chat_id in active else 0,
+                "reason": None if chat_id in active else "not in user_ids.json",
+            }
+        self.flush()
+        if offset and not get_meta(self.conn, OFFSET_KEY):
+            set_meta(self.conn, OFFSET_KEY, offset)
+        set_meta(self.conn, "subscribers_migrated", True)
+        if active or names:
+            print(f"📦 Imported {len(active)} active subscribers from legacy files")
+
+
+def dead_chat_reason(error):
+    """Return Telegram's description if `error` means the chat is gone for good"""
+    response = getattr(error, "response", None)
+    if response is None or response.status_code not in (400, 403):
+        return None
+    try:
+        description = response.json().get("description", "")
+    except ValueError:
+        description = response.text
+    if response.status_code == 403 or any(m in description.lower() for m in DEAD_CHAT_MARKERS):
+        return description or f"HTTP {response.status_code}"
+    return None
@@ -1,415 +1,357 @@
 import os
 import re
 import json
-import csv
-import requests
-import time
-from playwright.sync_api import sync_playwright
-from urllib.parse import urljoin
+import hashlib
+import itertools
 from datetime import datetime
+from http_client import client, USER_AGENT
+from metrics import Metrics
+from db import connect, get_meta, set_meta
+from outbox import Outbox
+from subscribers import SubscriberStore
+from dispatcher import WorkflowDispatcher
+from notice_store import NoticeStore
+from notice_parser import parse_notice_rows
+from crawler import iter_crawl
+from pipeline import NoticePipeline
+from fingerprint import FingerprintIndex, update_messages
+from search_index import SearchIndex
+from keyword_filters import NoticeRouter
+from update_feed import UpdateFeed
+from update_tracker import ProcessedUpdates
+from bot_commands import handle_updates
+from browser_scraper import BrowserScraper
 
 # --- Configuration ---
-CSV_FILE_NAME = "scraped_notices.csv"
-USER_IDS_FILE = "user_ids.json"
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 BASE_URL = "https://www.nu.ac.bd/"
+# How many table rows to read per scrape
+MAX_NOTICES = int(os.getenv("MAX_NOTICES", "20"))
+# Also crawl paginated/other NU notice listings (set CRAWL_ENABLED=0 to disable)
+CRAWL_ENABLED = os.getenv("CRAWL_ENABLED", "1") == "1"
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+# Shared with listener.py so an update is never handled by both
+PROCESSED_FILE = "processed_updates.json"
+# Re-check stored homepage notices for edited titles or re-uploaded PDFs (FINGERPRINT_ENABLED=0 to disable)
+FINGERPRINT_ENABLED = os.getenv("FINGERPRINT_ENABLED", "1") == "1"
+# Download and index notice PDFs for /search (SEARCH_INDEX_ENABLED=0 to disable)
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "1") == "1"
+
+metrics = Metrics("scraper")
+browser = None
 
 
 # ---------- GitHub Workflow Trigger ----------
 
-def trigger_github_workflow():
-    """Trigger GitHub workflow manually via API"""
-    GITHUB_TOKEN = os.getenv("TOKE_GITHUB_BOT")
-    if not GITHUB_TOKEN:
-        print("❌ GITHUB_TOKEN not set in secrets.")
-        return
-
-    GITHUB_OWNER = "fahim12064"  
-    GITHUB_REPO = "NU-Notice-Bot-Updated-"
-    WORKFLOW_FILE = "main.yml" 
-    REF = "main"
-
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/actions/workflows/{WORKFLOW_FILE}/dispatches"
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "Authorization": f"token {GITHUB_TOKEN}"
-    }
-    data = {"ref": REF}
-
-    try:
-        r = requests.post(url, headers=headers, json=data, timeout=15)
-        if r.status_code == 204:
-            print("✅ GitHub workflow triggered successfully!")
-        else:
-            print(f"❌ Workflow trigger failed ({r.status_code}): {r.text}")
-    except Exception as e:
-        print(f"⚠️ Error triggering workflow: {e}")
+def trigger_github_workflow(requesters=1):
+    """Request a workflow run; requests are merged with any queued/running or recent run"""
+    dispatcher = WorkflowDispatcher(os.getenv("TOKE_GITHUB_BOT"))
+    return dispatcher.request(requesters)
 
 
 # ---------- Utility Functions ----------
 
-def load_user_ids():
-    """Load user IDs from JSON file with proper string conversion"""
-    if not os.path.exists(USER_IDS_FILE):
-        return set()
-    try:
-        with open(USER_IDS_FILE, "r", encoding="utf-8") as f:
-            ids = json.load(f)
-            # Force convert all IDs to string to avoid quote issues
-            return {str(i) for i in ids}
-    except (FileNotFoundError, json.JSONDecodeError, Exception) as e:
-        print(f"Error loading user IDs: {e}")
-        return set()
-
-def save_user_ids(user_ids):
-    """Save user IDs to JSON file with proper encoding"""
-    with open(USER_IDS_FILE, "w", encoding="utf-8") as f:
-        json.dump(list(user_ids), f, indent=2, ensure_ascii=False)
-
-def load_last_update_data():
-    """Load last update ID and user data from file with UTF-8 encoding"""
-    last_update_file = "last_update_id.txt"
-    if not os.path.exists(last_update_file):
-        return 0, {}
-    
-    try:
-        with open(last_update_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            if not lines:
-                return 0, {}
-            
-            last_update_id = int(lines[0].strip())
-            user_data = {}
-            
-            for line in lines[1:]:
-                if line.strip():
-                    parts = line.strip().split(',', 1)
-                    if len(parts) == 2:
-                        chat_id, name = parts
-                        user_data[chat_id] = name
-            
-            return last_update_id, user_data
-    except Exception as e:
-        print(f"Error reading last update data: {e}")
-        return 0, {}
-
-def save_last_update_data(last_update_id, user_data):
-    """Save last update ID and user data to file with UTF-8 encoding"""
-    last_update_file = "last_update_id.txt"
+def send_reply(chat_id, text):
     try:
-        with open(last_update_file, "w", encoding="utf-8") as f:
-            f.write(str(last_update_id) + "\n")
-            for chat_id, name in user_data.items():
-                f.write(f"{chat_id},{name}\n")
+        client.post(
+            f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/sendMessage",
+            json={"chat_id": chat_id, "text": text},
+            timeout=10
+        )
     except Exception as e:
-        print(f"Error saving last update data: {e}")
+        print(f"❌ Failed to reply to {chat_id}: {e}")
 
 def handle_telegram_updates():
-    """Handle new Telegram users and save their data"""
+    """Handle bot commands (subscriptions, filters, search, scrape requests)
+
+    Updates come from the shared UpdateFeed; if a listener is already
+    long-polling it owns them and this run leaves them alone.
+    """
     if not TELEGRAM_BOT_TOKEN:
         print("⚠️ Telegram bot token not set")
         return
 
-    user_ids = load_user_ids()
-    last_update_id, user_data = load_last_update_data()
+    feed = UpdateFeed(TELEGRAM_API_BASE, TELEGRAM_BOT_TOKEN)
+    with feed.claim(timeout=10) as updates:
+        if not updates:
+            print("👍 No new Telegram messages")
+            return
+        # The listener may have handled these and died before moving the offset
+        processed_ids = ProcessedUpdates.load(PROCESSED_FILE)
+        handled = handle_updates(updates, send_reply, trigger_github_workflow, metrics, processed_ids)
+        if handled:
+            for update_id in handled:
+                processed_ids.add(update_id)
+            processed_ids.save(PROCESSED_FILE)
+    print(f"✅ Telegram updates handled ({len(handled)} updates, {SubscriberStore().count()} active subscribers)")
+
+def queue_notification(message, chat_ids=None, key=None):
+    """Durably queue a notification for all registered users, or the active ones
+    among `chat_ids` (nothing is sent yet)
+
+    The outbox drops a message whose `key` it already holds; by default that
+    is a hash of the text, so re-running a day never re-sends its alerts.
+    """
+    user_ids = SubscriberStore().active_ids()
+    if chat_ids is not None:
+        user_ids &= set(chat_ids)
+    if not user_ids:
+        print("🤷 No users registered to notify")
+        return None
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates?offset={last_update_id + 1}&timeout=10"
+    message_id = Outbox().enqueue(message, user_ids, key)
+    print(f"📥 Queued message #{message_id} for {len(user_ids)} users")
+    return message_id
 
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        updates = response.json().get("result", [])
-    except Exception as e:
-        print(f"❌ Telegram API error: {e}")
-        return
+def route_notices(router, notices):
+    """Split notices into (chat_ids, notices) groups following each chat's keyword filters"""
+    groups = router.route(notices, SubscriberStore().active_ids())
+    sent_to = sum(len(chat_ids) for chat_ids, _ in groups)
+    print(f"🎯 Routed {len(notices)} notices to {sent_to} chats in {len(groups)} groups")
+    return groups
 
-    if not updates:
-        print("👍 No new Telegram messages")
-        return
+def deliver_pending_notifications():
+    """Send every pending delivery in the outbox, resuming earlier interrupted runs"""
+    if not TELEGRAM_BOT_TOKEN:
+        print("⚠️ Telegram token not configured. Skipping notification")
+        return None
 
-    new_users_found = False
-    max_update_id = last_update_id
-
-    for update in updates:
-        max_update_id = max(max_update_id, update["update_id"])
-        msg = update.get("message", {})
-        text = msg.get("text", "")
-        chat = msg.get("chat", {})
-        chat_id = str(chat.get("id"))
-        first_name = msg.get("from", {}).get("first_name", "Friend")
-
-        if not chat_id or not text:
-            continue
-
-        if text.strip().lower() == "/start":
-            if chat_id not in user_ids:
-                user_ids.add(chat_id)
-                user_data[chat_id] = first_name
-                new_users_found = True
-                print(f"✅ New user registered: {chat_id} ({first_name})")
-
-                # Send welcome message
-                welcome_text = (
-                    f"👋 Welcome, {first_name}!\n\n"
-                    "You are now subscribed to receive notifications "
-                    "for new notices from National University 📢✨\n\n"
-                    "You will receive notifications when new notices are published."
-                )
-
-                try:
-                    send_url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-                    payload = {"chat_id": chat_id, "text": welcome_text}
-                    requests.post(send_url, json=payload, timeout=10)
-                except Exception as e:
-                    print(f"❌ Failed to send welcome message to {chat_id}: {e}")
-        elif text.strip().lower() == "scrape":
-            first_name = msg.get("from", {}).get("first_name", "বন্ধু")
-            print(f"⚡ Scrape command received from {first_name} ({chat_id})")
-
-            # ✅ টেলিগ্রামে রিপ্লাই পাঠানো
-            try:
-                reply_text = "🔄 GitHub workflow চলছে, একটু অপেক্ষা করুন..."
-                requests.post(
-                    f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage",
-                    json={"chat_id": chat_id, "text": reply_text},
-                    timeout=10
-                )
-            except Exception as e:
-                print(f"❌ রিপ্লাই পাঠাতে ব্যর্থ: {e}")
-
-            # 👉 এখন GitHub workflow ট্রিগার করো
-            trigger_github_workflow()
-
-    # Save new users
-    if new_users_found:
-        save_user_ids(user_ids)
-        print(f"💾 Saved {len(user_ids)} total users to user_ids.json")
-
-    # Save last update ID and user data
-    save_last_update_data(max_update_id, user_data)
-    print("✅ Telegram updates and user data saved successfully")
-
-def load_scraped_links_from_csv():
-    """Load scraped links from CSV file with improved CSV parsing"""
-    if not os.path.exists(CSV_FILE_NAME):
-        return set()
-    
-    links = set()
-    try:
-        with open(CSV_FILE_NAME, "r", encoding="utf-8", newline="") as f:
-            reader = csv.reader(f)
-            # Skip header
-            next(reader, None)
-            for row in reader:
-                # Skip empty rows
-                if not row or len(row) < 2:
-                    continue
-                
-                # The URL should be the second column
-                url = row[1].strip()
-                
-                # Only add if it's a valid URL
-                if url.startswith("http"):
-                    links.add(url)
-                    
-    except Exception as e:
-        print(f"Error reading CSV file: {e}")
-    
-    print(f"📊 Loaded {len(links)} URLs from CSV")
-    return links
+    send_url = f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    with metrics.stage("notify"):
+        report = Outbox().drain(send_url)
+    metrics.inc("messages_sent", report["sent"])
+    metrics.inc("messages_failed", report["failed"])
+    metrics.inc("messages_retried", report["retried"])
 
-def append_to_csv(notice_title, url, date):
-    """Append new notice to CSV file with proper CSV formatting"""
-    file_exists = os.path.exists(CSV_FILE_NAME)
-    try:
-        with open(CSV_FILE_NAME, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
-            if not file_exists:
-                writer.writerow(["Notice Title", "URL", "Date"])
-            writer.writerow([notice_title, url, date])
-        print(f"✅ Successfully saved to CSV: {notice_title[:30]}...")
-    except Exception as e:
-        print(f"Error saving to CSV: {e}")
+    # Stop wasting requests on chats Telegram says are blocked or deleted
+    purged = SubscriberStore().purge_dead(report["errors"])
+    if purged:
+        print(f"🧹 Purged {purged} dead chats from the subscriber list")
+
+    print(f"    ✅ Sent to {report['sent']} users, ❌ Failed for {report['failed']}")
+    return report
 
-def send_telegram_notification(message):
+def send_telegram_notification(message, key=None):
     """Send notification to all registered users using plain text (no parsing)"""
     if not TELEGRAM_BOT_TOKEN:
         print("⚠️ Telegram token not configured. Skipping notification")
-        return
+        return None
 
-    user_ids = load_user_ids()
-    if not user_ids:
-        print("🤷 No users registered to notify")
-        return
+    if queue_notification(message, key=key) is None:
+        return None
+    return deliver_pending_notifications()
 
-    print(f"✉️ Sending notification to {len(user_ids)} users...")
-    success = 0
-    fail = 0
-
-    for chat_id in user_ids:
-        try:
-            response = requests.post(
-                f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage",
-                data={
-                    "chat_id": chat_id,
-                    "text": message,
-                    "disable_web_page_preview": True
-                },
-                timeout=15
-            )
-            response.raise_for_status()
-            success += 1
-            print(f"✅ Sent to {chat_id}")
-            time.sleep(1)  # Rate limiting
-        except Exception as e:
-            fail += 1
-            print(f"❌ Failed to send to {chat_id}: {e}")
-    
-    print(f"    ✅ Sent to {success} users, ❌ Failed for {fail}")
+def send_no_notice(today):
+    """Tell users nothing new was posted, at most once per day however many runs find nothing"""
+    send_telegram_notification(f"📅 Date: {today}\n\n📭 No Notice", key=f"no-notice:{today}")
+
+def update_key(message, notices, fingerprints):
+    """Outbox key for an update alert: a later correction of the same notices
+    reads the same, so the key carries their new fingerprints as well"""
+    revision = "\n".join(sorted(fingerprints[n["url"]]["fingerprint"] or "" for n in notices))
+    return "update:" + hashlib.sha256(f"{message}\n{revision}".encode("utf-8")).hexdigest()
 
 # ---------- Scraper Functions ----------
 
-def scrape_nu_notices():
+def load_scrape_state():
+    """Validators, table hash and short-circuit counters from earlier runs"""
+    return get_meta(connect(), "scrape_state", {"runs": 0, "skipped_runs": 0})
+
+def save_scrape_state(state):
+    set_meta(connect(), "scrape_state", state)
+
+def notice_table_hash(notices):
+    """Stable hash of the extracted notice table"""
+    payload = json.dumps([[n["title"], n["url"], n["date"]] for n in notices], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def fetch_notices_http(limit=MAX_NOTICES, conditional=True):
+    """Fast path: read the notice table from the static homepage HTML (no browser)
+
+    With `conditional`, the last ETag/Last-Modified are sent back and a 304
+    reuses the previously extracted rows without downloading or parsing.
+    """
+    state = load_scrape_state() if conditional else {}
+    headers = {"User-Agent": USER_AGENT}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    response = client.get(BASE_URL, headers=headers, timeout=30)
+    if response.status_code == 304 and state.get("notices"):
+        print("🟰 Homepage not modified (304), reusing last extracted table")
+        return state["notices"][:limit]
+    response.raise_for_status()
+    if "charset" not in response.headers.get("Content-Type", "").lower():
+        response.encoding = "utf-8"
+    notices = parse_notice_rows(response.text, BASE_URL, limit)
+
+    if conditional:
+        state.update(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            notices=notices
+        )
+        save_scrape_state(state)
+    return notices
+
+def scrape_nu_notices(limit=MAX_NOTICES):
     """Scrape notices from National University website"""
     print("\n--- Step 1: Scraping NU Notices ---")
-    
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(BASE_URL, timeout=600000)
-
-            # Wait for table to appear
-            page.wait_for_selector("table tbody tr")
-            time.sleep(2)
-
-            # Locate all rows in the table
-            rows = page.locator("table tbody tr")
-            total = rows.count()
-            
-            # Limit to first 20 notices
-            if total > 20:
-                total = 20
-            
-            print(f"📊 Found {total} notices in the table")
-
-            all_data = []
-
-            for i in range(total):
-                row = rows.nth(i)
-                
-                # Extract notice title and link
-                title_element = row.locator("td:first-child a")
-                title = title_element.inner_text().strip() if title_element.count() > 0 else ""
-                href = title_element.get_attribute("href") if title_element.count() > 0 else ""
-                
-                # Extract publish date
-                date_element = row.locator("td:last-child")
-                publish_date = date_element.inner_text().strip() if date_element.count() > 0 else ""
-                
-                if href and title:
-                    # Convert relative URL to absolute URL
-                    full_url = urljoin(BASE_URL, href)
-                    
-                    all_data.append({
-                        "title": title,
-                        "url": full_url,
-                        "date": publish_date
-                    })
-                    print(f"📰 Found notice: {title[:50]}...")
-
-            browser.close()
 
+    try:
+        notices = fetch_notices_http(limit)
+    except Exception as e:
+        print(f"⚠️ HTTP fetch failed: {e}")
+        notices = []
+
+    if notices:
+        for notice in notices:
+            print(f"📰 Found notice: {notice['title'][:50]}...")
+        print(f"🎯 Total notices found: {len(notices)} (static HTML)")
+        return notices
+
+    print("↪️ No table rows in static HTML, falling back to the browser")
+    return scrape_nu_notices_browser(limit)
+
+def get_browser():
+    """One headless browser per process, reused by every browser-path scrape"""
+    global browser
+    if browser is None:
+        browser = BrowserScraper(BASE_URL, USER_AGENT, metrics=metrics)
+    return browser
+
+def scrape_nu_notices_browser(limit=MAX_NOTICES):
+    """Scrape notices with headless Chromium (for when the table is rendered by JS)"""
+    try:
+        all_data = get_browser().poll(limit)
+        for notice in all_data:
+            print(f"📰 Found notice: {notice['title'][:50]}...")
         print(f"🎯 Total notices found: {len(all_data)}")
         return all_data
     except Exception as e:
         print(f"❌ Error during scraping: {e}")
         return []
 
-def parse_date(date_str):
-    """Parse date string in format 'October 22, 2025' to datetime object"""
-    try:
-        return datetime.strptime(date_str, "%B %d, %Y")
-    except ValueError:
-        # Try alternative formats
-        try:
-            return datetime.strptime(date_str, "%b %d, %Y")
-        except ValueError:
-            print(f"❌ Could not parse date: {date_str}")
-            return None
-
 # ---------- Main Function ----------
 if __name__ == "__main__":
     print("--- Starting NU Notice Scraper and Telegram Bot ---")
     
     # Step 1: Check for new Telegram users
     print("\n--- Checking for New Telegram Users ---")
-    handle_telegram_updates()
+    with metrics.stage("telegram_updates"):
+        handle_telegram_updates()
+
+    # Finish deliveries an interrupted earlier run left behind
+    print("\n--- Resuming Pending Deliveries ---")
+    deliver_pending_notifications()
 
     # Step 2: Start scraping
-    all_notices = scrape_nu_notices()
+    with metrics.stage("scrape"):
+        all_notices = scrape_nu_notices()
+    if browser is not None:
+        browser.close()
+    metrics.inc("notices_scraped", len(all_notices))
+
+    # Compare with the table processed last time so unchanged runs short-circuit
+    scrape_state = load_scrape_state()
+    scrape_state["runs"] = scrape_state.get("runs", 0) + 1
+    table_hash = notice_table_hash(all_notices)
+    table_changed = table_hash != scrape_state.get("table_hash")
 
     if not all_notices:
         print("\n📭 No notices found")
         # Send "No Notice" message
+        send_no_notice(datetime.now().strftime("%Y-%m-%d"))
+    elif not table_changed:
+        scrape_state["skipped_runs"] = scrape_state.get("skipped_runs", 0) + 1
+        metrics.inc("runs_short_circuited")
+        print(
+            f"\n⏭️ Notice table unchanged since last run, skipping its dedup and storage "
+            f"({scrape_state['skipped_runs']}/{scrape_state['runs']} runs short-circuited)"
+        )
+
+    # Notices posted only to a listing never change the homepage table, so the
+    # crawl runs even when the homepage rows are skipped
+    if all_notices and (table_changed or CRAWL_ENABLED):
+        store = NoticeStore()
         today = datetime.now().strftime("%Y-%m-%d")
-        message = f"📅 Date: {today}\n\n📭 No Notice"
-        send_telegram_notification(message)
-    else:
-        scraped_links = load_scraped_links_from_csv()
-        print(f"🔎 Already scraped: {len(scraped_links)} notices")
-        
-        # Get today's date
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        # Group notices by date
-        notices_by_date = {}
-        
-        for notice in all_notices:
-            # Parse the notice date
-            notice_date = parse_date(notice["date"])
-            notice_date_str = notice_date.strftime("%Y-%m-%d") if notice_date else ""
-            
-            # Add to the appropriate date group
-            if notice_date_str:
-                if notice_date_str not in notices_by_date:
-                    notices_by_date[notice_date_str] = []
-                notices_by_date[notice_date_str].append(notice)
-        
-        # Process today's notices
-        if today in notices_by_date:
-            today_notices = notices_by_date[today]
-            
-            # Filter out already scraped notices
-            new_notices_to_send = [notice for notice in today_notices if notice["url"] not in scraped_links]
-            
-            if new_notices_to_send:
-                # Create message with all new notices for today
-                message = f"📅 Date: {today}\n\n🔔 New Notices Found\n\n"
-                
-                for i, notice in enumerate(new_notices_to_send, 1):
-                    message += f"{i}. {notice['title']}\n   View Notice: {notice['url']}\n\n"
-                
-                print(f"\n--- Sending {len(new_notices_to_send)} New Notices for {today} ---")
-                send_telegram_notification(message)
-                
-                # Save all new notices to CSV
-                for notice in new_notices_to_send:
-                    append_to_csv(notice["title"], notice["url"], notice["date"])
-            else:
-                print(f"\n✅ No new notices to send for {today}")
-                # Send "No Notice" message
-                message = f"📅 Date: {today}\n\n📭 No Notice"
-                send_telegram_notification(message)
-        else:
-            print(f"\n✅ No notices found for {today}")
+        print(f"🔎 Already scraped: {store.count()} notices")
+
+        # Follow pagination and the other NU listings so nothing that scrolled
+        # past the homepage table is lost; each listing stops at a stored URL.
+        # Crawled rows stream into the pipeline as each listing finishes.
+        rows = all_notices if table_changed else []
+        if CRAWL_ENABLED:
+            homepage_urls = {notice["url"] for notice in all_notices}
+            # The pipeline stores these while the crawl is still running; a
+            # listing must only stop at notices stored by an earlier run
+            fresh = {url for url in homepage_urls if not store.contains(url)}
+
+            def crawled_notices():
+                for notice in iter_crawl(lambda url: url not in fresh and store.contains(url)):
+                    if notice["url"] not in homepage_urls:
+                        fresh.add(notice["url"])
+                        metrics.inc("notices_crawled")
+                        yield notice
+
+            rows = itertools.chain(rows, crawled_notices())
+
+        # scrape -> dedup -> deliver: today's new notices go out while the
+        # crawl is still running, older ones are stored in batches
+        router = NoticeRouter.load()
+        pipeline = NoticePipeline(
+            today, queue_notification, deliver_pending_notifications, metrics,
+            route=lambda batch: route_notices(router, batch)
+        )
+        with metrics.stage("pipeline"):
+            stats = pipeline.run(rows)
+        metrics.inc("notices_seen", stats["seen"])
+        metrics.inc("notices_new", stats["new"])
+
+        if not stats["today_new"] and table_changed:
+            print(f"\n✅ No new notices to send for {today}")
             # Send "No Notice" message
-            message = f"📅 Date: {today}\n\n📭 No Notice"
-            send_telegram_notification(message)
-        
-        # Save all notices to CSV (for future reference)
-        for notice in all_notices:
-            if notice["url"] not in scraped_links:
-                append_to_csv(notice["title"], notice["url"], notice["date"])
-
+            send_no_notice(today)
+        print(f"💾 Stored {stats['new']} new notices ({store.count()} total)")
+
+    # A corrected PDF re-uploaded under the same URL leaves the table unchanged,
+    # so this runs even on short-circuited runs
+    if all_notices and FINGERPRINT_ENABLED:
+        print("\n--- Checking Stored Notices for Updates ---")
+        with metrics.stage("fingerprint"):
+            updated = FingerprintIndex(NoticeStore()).check(all_notices)
+        metrics.inc("notices_updated", len(updated))
+        if updated:
+            # Re-uploaded PDFs are downloaded and indexed again below
+            search_index = SearchIndex()
+            for notice, fields in updated:
+                if "pdf" in fields:
+                    search_index.invalidate(notice["url"])
+            today = datetime.now().strftime("%Y-%m-%d")
+            print(f"✏️ {len(updated)} stored notices changed")
+            fields_by_url = {notice["url"]: fields for notice, fields in updated}
+            fingerprints = NoticeStore().fingerprints(fields_by_url)
+            for chat_ids, notices in route_notices(NoticeRouter.load(), [notice for notice, _ in updated]):
+                for message in update_messages(today, [(n, fields_by_url[n["url"]]) for n in notices]):
+                    queue_notification(message, chat_ids, update_key(message, notices, fingerprints))
+            deliver_pending_notifications()
+        else:
+            print("✅ No stored notice changed")
+
+    # Notices are already delivered; indexing their PDFs can take its time
+    if SEARCH_INDEX_ENABLED:
+        print("\n--- Indexing Notice PDFs ---")
+        with metrics.stage("search_index"):
+            indexed = SearchIndex().index_pending()
+        metrics.inc("notices_indexed", indexed)
+
+    # Remember what was processed (only after the run got this far)
+    if all_notices:
+        scrape_state["table_hash"] = table_hash
+    save_scrape_state(scrape_state)
+
+    client.print_stats()
+    metrics.write()
     print("\n--- Mission Completed ---")
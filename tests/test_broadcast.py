@@ -0,0 +1,31 @@
+import os
+import sys
+import pytest
+from broadcast import broadcast
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from fake_telegram import FakeTelegram
+
+
+def test_failing_success_callback_does_not_resend():
+    results = []
+
+    def on_result(chat_id, ok, error):
+        results.append(ok)
+        if ok:
+            raise RuntimeError("database is locked")
+
+    with FakeTelegram() as fake:
+        with pytest.raises(RuntimeError):
+            broadcast(f"{fake.api_base}/botTEST/sendMessage", ["1"], "notice", on_result=on_result)
+    # Delivered once and never reported as a failure
+    assert len(fake.sent) == 1 and results == [True]
+
+
+def test_results_reported_per_chat():
+    results = {}
+    with FakeTelegram(blocked_chats=["2"]) as fake:
+        report = broadcast(f"{fake.api_base}/botTEST/sendMessage", ["1", "2", "3"], "notice",
+                           on_result=lambda chat_id, ok, error: results.__setitem__(chat_id, ok))
+    assert results == {"1": True, "2": False, "3": True}
+    assert report["sent"] == 2 and report["failed"] == 1 and set(report["errors"]) == {"2"}
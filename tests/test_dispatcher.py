@@ -0,0 +1,33 @@
+import db
+from dispatcher import WorkflowDispatcher, status_message
+from state import FileLock
+
+
+def make_dispatcher(tmp_path, monkeypatch, lock_wait=0.1):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "bot.db"))
+    dispatcher = WorkflowDispatcher("token", lock_wait=lock_wait)
+    dispatched = []
+    monkeypatch.setattr(dispatcher, "active_run", lambda: None)
+    monkeypatch.setattr(dispatcher, "dispatch", lambda: dispatched.append(1) or (True, 204))
+    return dispatcher, dispatched
+
+
+def test_second_request_in_window_is_coalesced(tmp_path, monkeypatch):
+    dispatcher, dispatched = make_dispatcher(tmp_path, monkeypatch)
+    assert dispatcher.request(2)[0] == "dispatched"
+    status, info = dispatcher.request(1)
+    assert status == "coalesced" and info["age"] >= 0
+    assert dispatched == [1]
+
+
+def test_busy_lock_coalesces_instead_of_waiting(tmp_path, monkeypatch):
+    dispatcher, dispatched = make_dispatcher(tmp_path, monkeypatch)
+    held = FileLock(f"{db.DB_FILE}.dispatch")
+    assert held.acquire()
+    try:
+        status, info = dispatcher.request(1)
+    finally:
+        held.release()
+    assert (status, info) == ("coalesced", {"age": None})
+    assert dispatched == []
+    assert "এই মুহূর্তে" in status_message(status, info)
@@ -0,0 +1,39 @@
+import random
+
+from keyword_filters import AhoCorasick, normalize
+
+
+def naive_find(patterns, text):
+    return {p for p in patterns if p and p in text}
+
+
+def test_overlapping_and_nested_patterns():
+    patterns = ["he", "she", "his", "hers", "s"]
+    assert AhoCorasick(patterns).find("ushers") == {"he", "she", "hers", "s"}
+
+
+def test_failure_links_recover_partial_matches():
+    # "abcd" fails on the last letter but "bce" must still be found
+    assert AhoCorasick(["abcd", "bce", "c"]).find("abce") == {"bce", "c"}
+
+
+def test_bengali_patterns():
+    patterns = [normalize(p) for p in ["অনার্স", "৪র্থ বর্ষ", "ডিগ্রি"]]
+    title = normalize("২০২৩ সালের অনার্স ৪র্থ বর্ষ পরীক্ষার কেন্দ্র তালিকা")
+    assert AhoCorasick(patterns).find(title) == {normalize("অনার্স"), normalize("৪র্থ বর্ষ")}
+
+
+def test_empty_patterns_and_text():
+    assert AhoCorasick(["", "a"]).find("") == set()
+    assert AhoCorasick([]).find("anything") == set()
+
+
+def test_matches_naive_substring_search():
+    rng = random.Random(19)
+    alphabet = "abc অন"
+    for _ in range(300):
+        patterns = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        matcher = AhoCorasick(patterns)
+        for _ in range(10):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            assert matcher.find(text) == naive_find(patterns, text), (patterns, text)
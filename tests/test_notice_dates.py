@@ -0,0 +1,54 @@
+import unicodedata
+from datetime import date
+
+import pytest
+
+from notice_dates import days_ago, normalize_date
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("October 23, 2025", "2025-10-23"),
+    ("23 October 2025", "2025-10-23"),
+    ("Oct 23, 2025", "2025-10-23"),
+    ("Sept 1st, 2025", "2025-09-01"),
+    ("  OCTOBER 23,2025 ", "2025-10-23"),
+])
+def test_english_month_names(text, expected):
+    assert normalize_date(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("২৩ অক্টোবর ২০২৫", "2025-10-23"),
+    ("অক্টোবর ২৩, ২০২৫", "2025-10-23"),
+    ("০১ জানুয়ারি ২০২৪", "2024-01-01"),
+    ("১৫ আগষ্ট ২০২৫", "2025-08-15"),
+    ("২৩-১০-২০২৫", "2025-10-23"),
+])
+def test_bengali_months_and_digits(text, expected):
+    assert normalize_date(text) == expected
+
+
+def test_decomposed_ya_matches_precomposed():
+    # The site mixes the precomposed and decomposed spellings of য়
+    decomposed = unicodedata.normalize("NFD", "১ জানুয়ারি ২০২৪")
+    assert normalize_date(decomposed) == "2024-01-01"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("23-10-2025", "2025-10-23"),
+    ("23/10/2025", "2025-10-23"),
+    ("23.10.25", "2025-10-23"),
+    ("2025-10-23", "2025-10-23"),
+    ("1/2/2024", "2024-02-01"),
+])
+def test_numeric_forms_are_day_first(text, expected):
+    assert normalize_date(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", None, "Notice", "31-02-2025", "October 2025", "13/13/2025"])
+def test_unrecognised_or_impossible_dates(text):
+    assert normalize_date(text) is None
+
+
+def test_days_ago():
+    assert days_ago(7, today=date(2025, 3, 3)) == "2025-02-24"
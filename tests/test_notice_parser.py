@@ -0,0 +1,67 @@
+import os
+from notice_parser import parse_notice_page, parse_notice_rows
+
+BASE_URL = "https://www.nu.ac.bd/"
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures", "nu_home.html")
+
+LISTING = """
+<table>
+  <thead><tr><th>Title</th><th>Published</th></tr></thead>
+  <tbody>
+    <tr><td><a href="uploads/notices/a.pdf">Honours 4th Year<br>Revised   Routine</a></td><td>October 23, 2025</td></tr>
+    <tr><td><a href="uploads/notices/b.pdf">Masters Result</a></td><td>October 22, 2025</td></tr>
+    <tr><td>No link in this row</td><td>October 22, 2025</td></tr>
+    <tr><td><a href="/uploads/notices/c.pdf">Degree Form Fill-up</a></td><td>October 21, 2025</td></tr>
+  </tbody>
+</table>
+<div class="pagination">{pager}</div>
+"""
+
+
+def load_fixture():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_homepage_fixture():
+    notices, next_url = parse_notice_page(load_fixture(), BASE_URL, limit=100)
+    assert len(notices) == 22 and next_url is None
+    assert notices[0]["url"] == "https://www.nu.ac.bd/uploads/notices/Press_Release_22-10-25.pdf"
+    assert notices[0]["date"] == "October 23, 2025"
+    assert notices[-1]["date"] == "October 21, 2025"
+    # The header row never becomes a notice
+    assert all(notice["title"] != "Title" for notice in notices)
+
+
+def test_row_cap():
+    notices = parse_notice_rows(load_fixture(), BASE_URL, limit=5)
+    assert len(notices) == 5
+    assert notices == parse_notice_rows(load_fixture(), BASE_URL, limit=100)[:5]
+
+
+def test_thead_skipped_and_linkless_rows_dropped():
+    notices, _ = parse_notice_page(LISTING.format(pager=""), BASE_URL)
+    assert [notice["url"].rsplit("/", 1)[-1] for notice in notices] == ["a.pdf", "b.pdf", "c.pdf"]
+
+
+def test_br_in_title_becomes_a_space():
+    notices, _ = parse_notice_page(LISTING.format(pager=""), BASE_URL)
+    assert notices[0]["title"] == "Honours 4th Year Revised Routine"
+
+
+def test_next_page_by_label():
+    pager = '<a href="?page=1">1</a> <a href="?page=2">2</a> <a href="?page=2">পরবর্তী</a>'
+    _, next_url = parse_notice_page(LISTING.format(pager=pager), BASE_URL + "recent-news-notice.php")
+    assert next_url == "https://www.nu.ac.bd/recent-news-notice.php?page=2"
+
+
+def test_next_page_by_rel():
+    pager = '<a href="recent-news-notice.php?page=3" rel="next"><i class="icon"></i></a>'
+    _, next_url = parse_notice_page(LISTING.format(pager=pager), BASE_URL)
+    assert next_url == "https://www.nu.ac.bd/recent-news-notice.php?page=3"
+
+
+def test_no_next_link_on_last_page():
+    pager = '<a href="?page=1">« Previous</a> <span>2</span>'
+    _, next_url = parse_notice_page(LISTING.format(pager=pager), BASE_URL)
+    assert next_url is None
@@ -0,0 +1,86 @@
+import os
+import sys
+import threading
+from collections import Counter
+import pytest
+import db
+import outbox
+from outbox import Outbox
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from fake_telegram import FakeTelegram
+
+CHATS = [str(1000 + i) for i in range(10)]
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "bot.db"))
+
+
+def send_url(fake):
+    return f"{fake.api_base}/botTEST/sendMessage"
+
+
+def statuses():
+    rows = db.connect().execute("SELECT chat_id, status, attempts FROM outbox_deliveries")
+    return {row["chat_id"]: (row["status"], row["attempts"]) for row in rows}
+
+
+def test_resume_after_partial_drain(monkeypatch):
+    Outbox().enqueue("notice", CHATS)
+    # A run claims everything, delivers three chats and dies holding the rest
+    monkeypatch.setattr(outbox, "LEASE_SECONDS", 0)
+    crashed = Outbox()
+    (message_id, _), claimed = next(iter(crashed.claim().items()))
+    for chat_id in claimed[:3]:
+        crashed.record(message_id, chat_id, True)
+
+    with FakeTelegram() as fake:
+        report = Outbox().drain(send_url(fake))
+    assert sorted(chat for chat, _ in fake.sent) == sorted(CHATS[3:])
+    assert report["sent"] == 7 and report["pending"] == 0
+    assert all(status == "sent" for status, _ in statuses().values())
+
+
+def test_reenqueue_is_a_noop():
+    box = Outbox()
+    first = box.enqueue("notice", CHATS)
+    assert box.enqueue("notice", CHATS[:5]) == first
+    with FakeTelegram() as fake:
+        box.drain(send_url(fake))
+        assert box.enqueue("notice", CHATS) == first
+        assert box.drain(send_url(fake))["sent"] == 0
+    assert len(fake.sent) == len(CHATS)
+    assert len(statuses()) == len(CHATS)
+
+
+def test_permanent_4xx_is_failed_not_retried():
+    box = Outbox()
+    box.enqueue("notice", CHATS)
+    with FakeTelegram(blocked_chats=[CHATS[0]]) as fake:
+        report = box.drain(send_url(fake))
+        assert box.drain(send_url(fake))["failed"] == 0
+    assert report["failed"] == 1 and CHATS[0] in report["errors"]
+    assert statuses()[CHATS[0]] == ("failed", 1)
+    assert len(fake.sent) == len(CHATS) - 1
+
+
+def test_concurrent_drains_send_exactly_once(monkeypatch):
+    chats = [str(2000 + i) for i in range(40)]
+    Outbox().enqueue("notice", chats)
+    # Small claims so both drains keep coming back for more
+    claim = Outbox.claim
+    monkeypatch.setattr(Outbox, "claim", lambda self, now=None, limit=5: claim(self, now, limit))
+
+    with FakeTelegram(latency=0.01) as fake:
+        reports = []
+        threads = [threading.Thread(target=lambda: reports.append(Outbox().drain(send_url(fake))))
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    counts = Counter(chat for chat, _ in fake.sent)
+    assert sorted(counts) == sorted(chats) and set(counts.values()) == {1}
+    assert sum(report["sent"] for report in reports) == len(chats)
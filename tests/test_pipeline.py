@@ -0,0 +1,50 @@
+from pipeline import build_messages, format_notice
+
+
+def notices(count, title="Notice"):
+    return [{"title": f"{title} {i}", "url": f"https://www.nu.ac.bd/uploads/notices/{i}.pdf"} for i in range(count)]
+
+
+def test_no_notices_no_messages():
+    assert build_messages("2025-10-23", []) == []
+
+
+def test_small_batch_fits_one_message():
+    messages = build_messages("2025-10-23", notices(3))
+    assert len(messages) == 1
+    assert messages[0].startswith("📅 Date: 2025-10-23\n\n🔔 New Notices Found\n\n")
+    assert "1. Notice 0" in messages[0] and "3. Notice 2" in messages[0]
+
+
+def test_chunks_stay_under_the_limit_and_keep_every_notice():
+    batch = notices(400)
+    messages = build_messages("2025-10-23", batch, limit=1000)
+    assert len(messages) > 1
+    assert all(len(m) <= 1000 for m in messages)
+    assert all(m.startswith("📅 Date: 2025-10-23\n\n") for m in messages)
+    # Numbering continues across chunks and each entry appears exactly once
+    body = "".join(messages)
+    for number, notice in enumerate(batch, 1):
+        assert body.count(format_notice(number, notice)) == 1
+
+
+def test_entries_are_never_split_across_messages():
+    messages = build_messages("2025-10-23", notices(50), limit=500)
+    for message in messages:
+        assert message.endswith("\n\n")
+
+
+def test_oversized_entry_is_truncated_to_fit():
+    [huge] = notices(1, title="x" * 10000)
+    messages = build_messages("2025-10-23", [huge], limit=4096)
+    assert len(messages) == 1
+    assert len(messages[0]) <= 4096
+    assert messages[0].endswith("…\n\n")
+
+
+def test_start_title_and_formatter():
+    messages = build_messages(
+        "2025-10-23", notices(2), start=5, title="✏️ Updated Notices",
+        formatter=lambda number, notice: f"{number}: {notice['title']}\n"
+    )
+    assert messages == ["📅 Date: 2025-10-23\n\n✏️ Updated Notices\n\n5: Notice 0\n6: Notice 1\n"]
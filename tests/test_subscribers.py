@@ -0,0 +1,40 @@
+import json
+import pytest
+import db
+from subscribers import SubscriberStore, USER_IDS_FILE
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "bot.db"))
+    return tmp_path
+
+
+def exported():
+    with open(USER_IDS_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_flush_exports_active_ids():
+    store = SubscriberStore()
+    store.upsert(1, "A")
+    store.upsert(2, "B")
+    store.flush()
+    assert exported() == ["1", "2"]
+    store.unsubscribe(1)
+    store.flush()
+    assert exported() == ["2"]
+
+
+def test_fresh_database_reimports_the_export(workdir, monkeypatch):
+    # Legacy file as committed by an older run
+    (workdir / USER_IDS_FILE).write_text(json.dumps(["7"]), encoding="utf-8")
+    store = SubscriberStore()
+    assert store.active_ids() == {"7"}
+    store.upsert(8, "New")
+    store.flush()
+
+    # The next runner starts without nu_bot.db but with the committed user_ids.json
+    monkeypatch.setattr(db, "DB_FILE", str(workdir / "fresh.db"))
+    assert SubscriberStore().active_ids() == {"7", "8"}
@@ -0,0 +1,76 @@
+import os
+import json
+import subprocess
+import sys
+from update_tracker import ProcessedUpdates
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_window_overflow_raises_the_floor():
+    processed = ProcessedUpdates(window=3)
+    for update_id in (10, 11, 12, 13, 14):
+        processed.add(update_id)
+    assert processed.floor == 11 and processed.recent == {12, 13, 14}
+    # Evicted IDs and anything older still count as processed
+    assert 10 in processed and 11 in processed and 5 in processed
+    assert 15 not in processed
+    assert processed.high_water == 14
+
+
+def test_add_is_idempotent():
+    processed = ProcessedUpdates(window=3)
+    for update_id in (1, 2, 2, 3, 3):
+        processed.add(update_id)
+    assert len(processed) == 3 and processed.floor == 0
+
+
+def test_legacy_list_format_loads(tmp_path):
+    path = tmp_path / "processed_updates.json"
+    path.write_text(json.dumps(list(range(1, 8))), encoding="utf-8")
+    processed = ProcessedUpdates.load(str(path))
+    assert all(update_id in processed for update_id in range(1, 8))
+    assert 8 not in processed
+
+
+def test_legacy_list_larger_than_window_keeps_newest():
+    processed = ProcessedUpdates.from_json(list(range(1, 11)), window=4)
+    assert processed.recent == {7, 8, 9, 10} and processed.floor == 6
+    assert all(update_id in processed for update_id in range(1, 11))
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "processed_updates.json")
+    processed = ProcessedUpdates(floor=100, recent=[101, 105])
+    processed.save(path)
+    loaded = ProcessedUpdates.load(path)
+    assert loaded.floor == 100 and loaded.recent == {101, 105}
+    assert ProcessedUpdates.load(str(tmp_path / "missing.json")).recent == set()
+
+
+def test_merge_keeps_both_sides():
+    mine = ProcessedUpdates(floor=10, recent=[12, 20])
+    theirs = ProcessedUpdates(floor=15, recent=[16, 21])
+    mine.merge(theirs)
+    assert mine.floor == 15
+    assert mine.recent == {16, 20, 21}
+    assert all(update_id in mine for update_id in (12, 15, 16, 20, 21))
+    assert 17 not in mine
+
+
+def test_save_merges_with_another_process(tmp_path):
+    path = str(tmp_path / "processed_updates.json")
+    ours = ProcessedUpdates.load(path)
+    ours.add(1)
+    # Another process records its own IDs between our load and save
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1])\n"
+        "from update_tracker import ProcessedUpdates\n"
+        "theirs = ProcessedUpdates.load(sys.argv[2])\n"
+        "theirs.add(2); theirs.add(3)\n"
+        "theirs.save(sys.argv[2])\n"
+    )
+    subprocess.run([sys.executable, "-c", script, ROOT, path], check=True)
+    ours.save(path)
+    on_disk = ProcessedUpdates.load(path)
+    assert all(update_id in on_disk for update_id in (1, 2, 3))
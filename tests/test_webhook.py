@@ -0,0 +1,110 @@
+import json
+from update_tracker import RecentUpdates
+from webhook import WebhookServer
+
+SECRET = "test-secret"
+
+
+def post(server, update_id):
+    body = json.dumps({"update_id": update_id, "message": {"chat": {"id": 42}, "text": "/start"}}).encode()
+    headers = {"x-telegram-bot-api-secret-token": SECRET}
+    return server.accept("POST", server.path, headers, body)
+
+
+def queued(server):
+    return sum(lane.qsize() for lane in server.lanes)
+
+
+def make_server():
+    return WebhookServer(lambda chat_id, text: None, lambda requesters: None, secret=SECRET, processed_file=None)
+
+
+def test_late_update_is_handled_not_deduplicated():
+    server = make_server()
+    for update_id in range(1, 602):
+        if update_id != 5:
+            assert post(server, update_id) == 200
+    # Telegram retried update 5 after hundreds of later ones went through
+    assert post(server, 5) == 200
+    assert server.stats["duplicates"] == 0
+    assert queued(server) == 601
+
+
+def test_redelivery_is_acknowledged_once():
+    server = make_server()
+    assert post(server, 7) == 200
+    assert post(server, 7) == 200
+    assert server.stats["duplicates"] == 1
+    assert queued(server) == 1
+
+
+def test_wrong_secret_is_rejected():
+    server = make_server()
+    body = json.dumps({"update_id": 1}).encode()
+    assert server.accept("POST", server.path, {"x-telegram-bot-api-secret-token": "nope"}, body) == 401
+    assert queued(server) == 0
+
+
+def test_recent_updates_forget_by_age_and_size():
+    recent = RecentUpdates(horizon=60, limit=3)
+    recent.add(10, now=0)
+    recent.add(3, now=30)
+    assert 10 in recent and 3 in recent
+    recent.add(11, now=61)
+    assert 10 not in recent and 3 in recent
+    for update_id in (12, 13):
+        recent.add(update_id, now=62)
+    # Over the limit the earliest arrival goes, whatever its ID
+    assert 3 not in recent and len(recent) == 3
+
+
+def test_recent_updates_round_trip(tmp_path):
+    path = str(tmp_path / "seen.json")
+    first = RecentUpdates()
+    first.add(100)
+    first.save(path)
+    second = RecentUpdates()
+    second.add(2)
+    second.save(path)
+    loaded = RecentUpdates.load(path)
+    assert 100 in loaded and 2 in loaded and 3 not in loaded
+
+
+def test_retried_batch_does_not_reply_twice(tmp_path, monkeypatch):
+    import asyncio
+    import db
+    import webhook
+    from subscribers import SubscriberStore
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(webhook, "RETRY_DELAY", 0)
+    real_flush, failures, replies, dispatches = SubscriberStore.flush, [], [], []
+
+    def flaky_flush(store):
+        # Fail the batch's final flush, once its replies are already out
+        if replies and not failures:
+            failures.append(1)
+            raise RuntimeError("database is locked")
+        return real_flush(store)
+
+    monkeypatch.setattr(SubscriberStore, "flush", flaky_flush)
+    server = WebhookServer(lambda chat_id, text: replies.append(chat_id),
+                           lambda requesters: dispatches.append(requesters) or ("dispatched", {}),
+                           secret=SECRET, workers=1, processed_file=None)
+    for update_id, chat_id, text in ((1, 42, "/start"), (2, 43, "scrape")):
+        body = json.dumps({"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": text}}).encode()
+        assert server.accept("POST", server.path, {"x-telegram-bot-api-secret-token": SECRET}, body) == 200
+
+    async def run():
+        lanes = [asyncio.create_task(server._lane(queue)) for queue in server.lanes]
+        await server.drain()
+        for lane in lanes:
+            lane.cancel()
+
+    asyncio.run(run())
+    server.executor.shutdown()
+    assert server.stats["retried"] == 2 and server.stats["handled"] == 2
+    assert sorted(replies) == ["42", "43"] and dispatches == [1]
+    # The retry still saved the subscriber the failed flush lost
+    assert SubscriberStore().active_ids() == {"42"}
@@ -0,0 +1,80 @@
+import db
+from contextlib import contextmanager
+from http_client import client
+from db import connect, get_meta, set_meta
+from state import FileLock
+from subscribers import SubscriberStore
+
+# --- Configuration ---
+OFFSET_KEY = "telegram_offset"
+# Per-process offsets used before the feed existed; the highest one wins once
+LEGACY_OFFSET_KEYS = ("listener_offset", "scraper_offset")
+# Set by `webhook.py set` while Telegram pushes updates; getUpdates would fail with 409
+WEBHOOK_META_KEY = "webhook_url"
+
+
+class UpdateFeed:
+    """The single owner of the Telegram getUpdates offset
+
+    The listener and the scraper both read updates through claim(): it takes
+    a cross-process lock, fetches from the shared offset, and advances the
+    offset only after the caller has handled the batch without raising. Two
+    processes therefore never receive (or confirm away) the same updates,
+    and a crash mid-batch gets the batch redelivered.
+    """
+
+    def __init__(self, api_base, token, conn=None):
+        self.url = f"{api_base}/bot{token}/getUpdates"
+        self.conn = conn or connect()
+        self.lock = FileLock(f"{db.DB_FILE}.updates")
+        self.ok = True
+
+    def offset(self):
+        offset = get_meta(self.conn, OFFSET_KEY)
+        if offset is None:
+            # The one-time legacy import may carry last_update_id.txt's offset
+            SubscriberStore(self.conn)
+            offset = max(get_meta(self.conn, key, 0) for key in LEGACY_OFFSET_KEYS)
+            set_meta(self.conn, OFFSET_KEY, offset)
+        return offset
+
+    def _fetch(self, offset, timeout):
+        try:
+            # Long poll: not worth retrying inside the client, the next cycle polls again
+            response = client.get(
+                self.url, params={"offset": offset + 1, "timeout": timeout},
+                timeout=timeout + 10, retries=0
+            )
+            self.ok = response.status_code == 200
+            if not self.ok:
+                print(f"❌ getUpdates returned HTTP {response.status_code}")
+                return []
+            return response.json().get("result", [])
+        except Exception as e:
+            self.ok = False
+            print(f"❌ Error fetching updates: {e}")
+            return []
+
+    @contextmanager
+    def claim(self, timeout=0, wait=0):
+        """Yield the next batch of updates; the offset moves past it on a clean exit
+
+        `timeout` is the long-poll time. If another process holds the feed for
+        longer than `wait` seconds, an empty batch is yielded instead.
+        """
+        webhook_url = get_meta(self.conn, WEBHOOK_META_KEY)
+        if webhook_url:
+            print(f"⏭️ Updates are delivered to the webhook at {webhook_url}")
+            yield []
+            return
+        if not self.lock.acquire(wait):
+            print("⏭️ Another process is reading Telegram updates")
+            yield []
+            return
+        try:
+            updates = self._fetch(self.offset(), timeout)
+            yield updates
+            if updates:
+                set_meta(self.conn, OFFSET_KEY, max(u["update_id"] for u in updates))
+        finally:
+            self.lock.release()
@@ -0,0 +1,141 @@
+import os
+import time
+from state import FileLock, read_json, write_json_atomic
+
+# --- Configuration ---
+RECENT_WINDOW = int(os.getenv("PROCESSED_WINDOW", "500"))
+# Webhook dedup: how long Telegram may keep re-sending an update, and a memory cap
+RECENT_HORIZON = float(os.getenv("WEBHOOK_DEDUP_SECONDS", "3600"))
+RECENT_MAX = int(os.getenv("WEBHOOK_DEDUP_MAX", "100000"))
+
+
+class ProcessedUpdates:
+    """Bounded record of processed Telegram update_ids
+
+    Telegram update IDs only increase, so everything at or below `floor` is
+    known to be processed and only the most recent `window` IDs above it are
+    kept explicitly. Memory and file size stay constant however long the bot
+    runs. Supports `in`, `add()` and `len()` like the set it replaces.
+    """
+
+    def __init__(self, floor=0, recent=(), window=RECENT_WINDOW):
+        self.floor = floor
+        self.window = window
+        self.recent = set()
+        for update_id in recent:
+            self.add(update_id)
+
+    def __contains__(self, update_id):
+        return update_id <= self.floor or update_id in self.recent
+
+    def __len__(self):
+        return len(self.recent)
+
+    @property
+    def high_water(self):
+        return max(self.recent, default=self.floor)
+
+    def add(self, update_id):
+        if update_id in self:
+            return
+        self.recent.add(update_id)
+        while len(self.recent) > self.window:
+            # Raise the floor past the oldest ID instead of remembering it
+            oldest = min(self.recent)
+            self.recent.discard(oldest)
+            self.floor = max(self.floor, oldest)
+
+    def to_json(self):
+        return {"floor": self.floor, "high_water": self.high_water, "recent": sorted(self.recent)}
+
+    @classmethod
+    def from_json(cls, data, window=RECENT_WINDOW):
+        # Older files are a plain list of every processed ID
+        if isinstance(data, list):
+            return cls(recent=data, window=window)
+        return cls(floor=data.get("floor", 0), recent=data.get("recent", []), window=window)
+
+    def merge(self, other):
+        """Fold in IDs another process recorded (both sets stay valid)"""
+        self.floor = max(self.floor, other.floor)
+        self.recent = {update_id for update_id in self.recent if update_id > self.floor}
+        for update_id in other.recent:
+            self.add(update_id)
+
+    @classmethod
+    def load(cls, path):
+        data = read_json(path)
+        return cls.from_json(data) if data is not None else cls()
+
+    def save(self, path):
+        """Merge with what is on disk and rewrite it atomically, under the file's lock"""
+        with FileLock(path):
+            self.merge(ProcessedUpdates.load(path))
+            write_json_atomic(path, self.to_json())
+
+
+
+class RecentUpdates:
+    """Webhook update_ids seen within the last `horizon` seconds
+
+    Webhook deliveries arrive out of order (Telegram retries a failed POST
+    while later updates go through), so unlike ProcessedUpdates there is no
+    floor: an ID is only ever answered as a duplicate if it was itself seen.
+    IDs are forgotten in arrival order once older than `horizon` or beyond
+    `limit` entries, which bounds memory without touching late arrivals.
+    """
+
+    def __init__(self, seen=(), horizon=RECENT_HORIZON, limit=RECENT_MAX):
+        self.horizon = horizon
+        self.limit = limit
+        # update_id -> arrival time, in arrival order
+        self.seen = {}
+        for update_id, at in sorted(seen, key=lambda item: item[1]):
+            self.seen[update_id] = at
+        self.expire()
+
+    def __contains__(self, update_id):
+        return update_id in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+    def add(self, update_id, now=None):
+        now = time.time() if now is None else now
+        self.seen.pop(update_id, None)
+        self.seen[update_id] = now
+        self.expire(now)
+
+    def expire(self, now=None):
+        cutoff = (time.time() if now is None else now) - self.horizon
+        while self.seen:
+            oldest = next(iter(self.seen))
+            if self.seen[oldest] >= cutoff and len(self.seen) <= self.limit:
+                break
+            del self.seen[oldest]
+
+    def to_json(self):
+        return {"seen": [[update_id, at] for update_id, at in self.seen.items()]}
+
+    @classmethod
+    def from_json(cls, data, horizon=RECENT_HORIZON, limit=RECENT_MAX):
+        return cls(seen=data.get("seen", []) if isinstance(data, dict) else [], horizon=horizon, limit=limit)
+
+    def merge(self, other):
+        """Fold in IDs another process recorded, keeping the later arrival time"""
+        combined = dict(other.seen)
+        for update_id, at in self.seen.items():
+            combined[update_id] = max(at, combined.get(update_id, at))
+        self.seen = dict(sorted(combined.items(), key=lambda item: item[1]))
+        self.expire()
+
+    @classmethod
+    def load(cls, path):
+        data = read_json(path)
+        return cls.from_json(data) if data is not None else cls()
+
+    def save(self, path):
+        """Merge with what is on disk and rewrite it atomically, under the file's lock"""
+        with FileLock(path):
+            self.merge(RecentUpdates.load(path))
+            write_json_atomic(path, self.to_json())
@@ -0,0 +1,281 @@
+import os
+import sys
+import hmac
+import json
+import signal
+import asyncio
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http_client import client
+from metrics import Metrics
+from db import connect, set_meta
+from update_tracker import RecentUpdates
+from dispatcher import WorkflowDispatcher
+from bot_commands import handle_updates
+from update_feed import WEBHOOK_META_KEY
+
+# --- Configuration ---
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+# Handler lanes; a chat always maps to the same lane so its commands stay in order
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
+# Updates handed to one handle_updates() call (one subscriber flush, one dispatch)
+WEBHOOK_BATCH = int(os.getenv("WEBHOOK_BATCH", "100"))
+# An accepted update is never re-sent by Telegram, so a failed batch is retried here
+HANDLE_ATTEMPTS = int(os.getenv("WEBHOOK_HANDLE_ATTEMPTS", "4"))
+RETRY_DELAY = 1.0
+SAVE_INTERVAL = 5.0
+MAX_BODY_BYTES = 1024 * 1024
+SEEN_FILE = "webhook_updates.json"
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class WebhookServer:
+    """asyncio receiver for Telegram webhook POSTs
+
+    Each request is checked against X-Telegram-Bot-Api-Secret-Token,
+    deduplicated by update_id and acknowledged immediately; handling happens
+    afterwards on WEBHOOK_WORKERS lanes that run the shared bot_commands
+    handlers in a thread pool. Telegram retries anything not answered with
+    200, so the ack never waits for SQLite or outgoing replies. Once acked
+    an update is ours alone, so a lane retries a failed batch with backoff.
+    """
+
+    def __init__(self, send, dispatch, secret=WEBHOOK_SECRET, path=WEBHOOK_PATH,
+                 workers=WEBHOOK_WORKERS, processed_file=SEEN_FILE, metrics=None):
+        self.send = send
+        self.dispatch = dispatch
+        self.secret = secret.encode("utf-8")
+        self.path = path
+        self.processed_file = processed_file
+        self.processed = RecentUpdates.load(processed_file) if processed_file else RecentUpdates()
+        self.metrics = metrics
+        self.lanes = [asyncio.Queue() for _ in range(max(1, workers))]
+        self.executor = ThreadPoolExecutor(max_workers=len(self.lanes), thread_name_prefix="webhook")
+        self.stats = {"received": 0, "duplicates": 0, "rejected": 0, "handled": 0, "retried": 0, "failed": 0}
+        self.server = None
+        self.tasks = []
+
+    # ----- HTTP -----
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY_BYTES:
+            return method, target, headers, None
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body
+
+    def _respond(self, writer, status, keep_alive):
+        body = b'{"ok":true}' if status == 200 else b""
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status = self.accept(method, target, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close" and status != 413
+                self._respond(writer, status, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def accept(self, method, target, headers, body):
+        """Validate one POST and queue its update; returns the HTTP status to answer with"""
+        if target.split("?", 1)[0] != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        token = headers.get("x-telegram-bot-api-secret-token", "").encode("utf-8")
+        if not self.secret or not hmac.compare_digest(token, self.secret):
+            self.stats["rejected"] += 1
+            return 401
+        if body is None:
+            return 413
+        try:
+            update = json.loads(body)
+            update_id = int(update["update_id"])
+        except (ValueError, KeyError, TypeError):
+            return 400
+
+        self.stats["received"] += 1
+        # Telegram re-sends until it sees a 200, possibly after later updates; answer
+        # repeats of an ID seen recently without handling them again
+        if update_id in self.processed:
+            self.stats["duplicates"] += 1
+            return 200
+        self.processed.add(update_id)
+        chat_id = update.get("message", {}).get("chat", {}).get("id", update_id)
+        self.lanes[zlib.crc32(str(chat_id).encode()) % len(self.lanes)].put_nowait(update)
+        return 200
+
+    # ----- handling -----
+
+    async def _lane(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < WEBHOOK_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+            # Updates whose replies already went out; a retry does not send them again
+            replied = set()
+            try:
+                for attempt in range(1, HANDLE_ATTEMPTS + 1):
+                    try:
+                        await loop.run_in_executor(
+                            self.executor, handle_updates, batch, self.send, self.dispatch, self.metrics, None, replied
+                        )
+                        self.stats["handled"] += len(batch)
+                        break
+                    except Exception as e:
+                        if attempt == HANDLE_ATTEMPTS:
+                            self.stats["failed"] += len(batch)
+                            ids = [update["update_id"] for update in batch]
+                            print(f"❌ Giving up on {len(batch)} updates after {attempt} attempts ({e}): {ids}")
+                            break
+                        delay = RETRY_DELAY * 2 ** (attempt - 1)
+                        self.stats["retried"] += len(batch)
+                        print(f"⚠️ Handling {len(batch)} updates failed ({e}), retrying in {delay:.0f}s")
+                        await asyncio.sleep(delay)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _save_loop(self):
+        while True:
+            await asyncio.sleep(SAVE_INTERVAL)
+            await self.save()
+
+    async def save(self):
+        if not self.processed_file:
+            return
+        # The loop keeps adding IDs while the file is written; save a copy
+        snapshot = RecentUpdates(self.processed.seen.items(), self.processed.horizon, self.processed.limit)
+        await asyncio.get_running_loop().run_in_executor(None, snapshot.save, self.processed_file)
+
+    # ----- lifecycle -----
+
+    async def start(self, host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+        self.server = await asyncio.start_server(self._connection, host, port, backlog=1024)
+        self.tasks = [asyncio.create_task(self._lane(q)) for q in self.lanes]
+        self.tasks.append(asyncio.create_task(self._save_loop()))
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def drain(self):
+        """Wait until every accepted update has been handled"""
+        for queue in self.lanes:
+            await queue.join()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.drain()
+        for task in self.tasks:
+            task.cancel()
+        await self.save()
+        self.executor.shutdown(wait=True)
+
+
+# ---------- Telegram setup ----------
+
+def set_webhook(url):
+    """Register `url` with Telegram (with the secret token) and pause getUpdates polling"""
+    response = client.post(
+        f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/setWebhook",
+        json={"url": url, "secret_token": WEBHOOK_SECRET, "allowed_updates": ["message"],
+              "max_connections": 40},
+        timeout=15
+    )
+    response.raise_for_status()
+    set_meta(connect(), WEBHOOK_META_KEY, url)
+    print(f"🔗 Webhook set to {url}")
+
+
+def delete_webhook():
+    """Unregister the webhook so the listener/scraper can poll getUpdates again"""
+    response = client.post(f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/deleteWebhook", timeout=15)
+    response.raise_for_status()
+    set_meta(connect(), WEBHOOK_META_KEY, None)
+    print("🔌 Webhook deleted, polling can resume")
+
+
+# ---------- Entry point ----------
+
+def send_telegram_message(chat_id, text):
+    try:
+        client.post(
+            f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/sendMessage",
+            json={"chat_id": chat_id, "text": text},
+            timeout=10
+        )
+    except Exception as e:
+        print(f"❌ Send failed: {e}")
+
+
+async def serve():
+    metrics = Metrics("webhook")
+    dispatcher = WorkflowDispatcher(GITHUB_TOKEN)
+    server = WebhookServer(send_telegram_message, dispatcher.request, metrics=metrics)
+    host, port = await server.start()
+    print(f"🪝 Webhook receiver listening on {host}:{port}{WEBHOOK_PATH}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    print("🛑 Stopping: finishing queued updates...")
+    await server.stop()
+    for key, value in server.stats.items():
+        metrics.inc(f"webhook_{key}", value)
+    metrics.write()
+    client.print_stats()
+    print(f"👋 Webhook stopped ({server.stats})")
+
+
+def main():
+    # python webhook.py                    -> run the receiver
+    # python webhook.py set <public url>   -> register the webhook with Telegram
+    # python webhook.py delete             -> go back to getUpdates polling
+    if len(sys.argv) >= 3 and sys.argv[1] == "set":
+        set_webhook(sys.argv[2])
+    elif len(sys.argv) >= 2 and sys.argv[1] == "delete":
+        delete_webhook()
+    else:
+        if not WEBHOOK_SECRET:
+            sys.exit("TELEGRAM_WEBHOOK_SECRET must be set; unauthenticated updates are rejected")
+        asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()